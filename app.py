@@ -1,12 +1,26 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from gui.login_window import LoginWindow
+from startup_trace import StartupTrace
+
+# Создается до остальных импортов, чтобы замерить и их (SUPPORT_STARTUP_TRACE=1)
+trace = StartupTrace.from_env()
+
 
 def main():
+    # Импорты внутри main — чтобы этапы старта замерялись по отдельности
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+    trace.mark("импорт PyQt6")
+    from gui.login_window import LoginWindow
+    trace.mark("импорт окна входа")
+
     app = QApplication(sys.argv)
+    trace.mark("QApplication")
     login_window = LoginWindow()
     login_window.show()
+    trace.mark("создание окна входа")
+    # Срабатывает в первой итерации цикла событий — после того, как окно показано
+    QTimer.singleShot(0, lambda: trace.finish("первая отрисовка"))
     sys.exit(app.exec())
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
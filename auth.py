@@ -1,46 +1,82 @@
-from database import get_db
+import os
+
+from sqlalchemy.exc import IntegrityError
+
+from database import session_scope
 from models import User, UserRole
 import bcrypt
 
+# Стоимость bcrypt: каждый +1 удваивает время хеширования (и проверки пароля)
+BCRYPT_ROUNDS = int(os.environ.get("SUPPORT_BCRYPT_ROUNDS", "12"))
+
+
+def hash_password(password: str, rounds: int = None) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds or BCRYPT_ROUNDS)).decode()
+
+
+def hash_cost(password_hash: str) -> int:
+    """Стоимость из хеша вида $2b$12$..."""
+    try:
+        return int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(password_hash: str) -> bool:
+    return hash_cost(password_hash) != BCRYPT_ROUNDS
+
+
 def authenticate_user(username: str, password: str):
-    db = next(get_db())
-    user = db.query(User).filter(User.username == username).first()
+    """Проверка пароля; вызывается из фонового потока, т.к. bcrypt работает сотни миллисекунд"""
+    # Соединение возвращается в пул до хеширования, а не удерживается на время bcrypt
+    with session_scope() as db:
+        user = db.query(User).filter(User.username == username).first()
     if not user or not bcrypt.checkpw(password.encode(), user.password_hash.encode()):
         return False
+
+    # Пароль известен только сейчас — прозрачно перехешируем под текущую стоимость
+    if needs_rehash(user.password_hash):
+        new_hash = hash_password(password)
+        try:
+            with session_scope() as db:
+                db.query(User).filter(User.id == user.id).update({User.password_hash: new_hash})
+            user.password_hash = new_hash
+        except Exception:
+            pass  # Вход не должен срываться из-за неудачного перехеширования
     return user
 
 
 def register_user(username: str, password: str, full_name: str, role: UserRole = UserRole.CLIENT):
     """Регистрация нового пользователя (только с ролью CLIENT)"""
-    db = next(get_db())
-    try:
+    with session_scope() as db:
         if db.query(User).filter(User.username == username).first():
             return None
 
-        hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    hashed_pw = hash_password(password)
+
+    new_user = User(
+        username=username,
+        password_hash=hashed_pw,
+        full_name=full_name,
+        role=role
+    )
+
+    try:
+        with session_scope() as db:
+            db.add(new_user)
+    except IntegrityError:
+        return None  # Логин заняли параллельно, пока считался хеш
+    return new_user
 
-        new_user = User(
-            username=username,
-            password_hash=hashed_pw,
-            full_name=full_name,
-            role=role
-        )
 
-        db.add(new_user)
-        db.commit()
-        return new_user
-    except Exception:
-        db.rollback()
-        raise
 def create_user(username: str, password: str, full_name: str, role: str):
-    db = next(get_db())
-    hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    hashed_password = hash_password(password)
     new_user = User(
         username=username,
         password_hash=hashed_password,
         full_name=full_name,
         role=role
     )
-    db.add(new_user)
-    db.commit()
-    return new_user
\ No newline at end of file
+    with session_scope() as db:
+        db.add(new_user)
+    return new_user
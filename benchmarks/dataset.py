@@ -0,0 +1,28 @@
+"""Детерминированный набор данных для бенчмарков.
+
+Данные генерирует script.py с фиксированными seed и последним днем, поэтому замеры
+на разных машинах и в разных ветках сравнимы. Вход замеряется под демо-клиентом.
+"""
+from datetime import datetime
+
+from sqlalchemy import func, inspect, select
+
+from models import Ticket
+from script import DEMO_USERS, seed_database
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+SEED = 42
+DATASET_END = datetime(2025, 1, 1)  # Заявки распределены по году до этой даты
+DEMO_CLIENT, DEMO_PASSWORD = DEMO_USERS[2][:2]
+
+
+def ticket_count(bind):
+    if not inspect(bind).has_table("tickets"):
+        return 0
+    with bind.connect() as conn:
+        return conn.execute(select(func.count(Ticket.id))).scalar()
+
+
+def seed(bind, tickets):
+    """Создает схему и заполняет пустую базу tickets заявками"""
+    seed_database(bind, tickets, SEED, DATASET_END.date(), log=lambda message: print(f"  {message}"))
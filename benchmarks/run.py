@@ -0,0 +1,217 @@
+"""Бенчмарки путей данных: списки заявок, отчеты, вход и список пользователей.
+
+Каждая операция выполняется без GUI на локальной базе, заполненной детерминированным
+набором (benchmarks/dataset.py). Для каждой операции печатаются медиана и минимум времени
+и пиковая память Python (tracemalloc, отдельным прогоном — трассировка замедляет код).
+Результаты сравниваются с benchmarks/baselines.json; медленнее или прожорливее базовой
+линии больше чем на --tolerance (и на MIN_DELTA_MS / MIN_DELTA_KIB) — регрессия, код выхода 1.
+
+    python -m benchmarks.run --size 100k                      # SQLite в benchmarks/.data/
+    python -m benchmarks.run --size 1m --database-url postgresql+psycopg2://.../bench
+    python -m benchmarks.run --size 100k --save-baseline      # Обновить базовую линию
+
+База заполняется только если она пуста; для PostgreSQL укажите отдельную базу.
+Базовые линии зависят от машины — обновляйте их на той же, где сравниваете.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINES_PATH = BENCH_DIR / "baselines.json"
+DATA_DIR = BENCH_DIR / ".data"
+# Абсолютные пороги: на быстрых операциях шум в доли миллисекунды больше любого процента
+MIN_DELTA_MS = 2.0
+MIN_DELTA_KIB = 64.0
+
+
+class Benchmarks:
+    """Операции для замера; каждая — метод без аргументов, возвращающий что угодно"""
+
+    def __init__(self, users, day, temp_dir):
+        self.admin, self.technician, self.client = users
+        self.day = day
+        self.temp_dir = temp_dir
+        self.month = (day.replace(day=1), day.replace(day=1) + timedelta(days=30))
+        self.deep_after = None
+
+    def operations(self):
+        # Импорты отложены до выбора базы: database читает SUPPORT_DATABASE_URL при импорте
+        from auth import authenticate_user
+        from database import session_scope
+        from models import TicketStatus
+        from ticket_queries import fetch_ticket_page
+        from ticket_search import search_tickets
+        from ticket_stats import report_summary
+        from user_queries import fetch_user_page
+        from benchmarks.dataset import DEMO_CLIENT, DEMO_PASSWORD
+        from gui.report_cache import ReportCache
+        from gui.report_generator import ReportGenerator
+
+        def tickets(user, **filters):
+            with session_scope() as db:
+                return fetch_ticket_page(db, user, **filters)
+
+        with session_scope() as db:
+            # Строка, после которой начинается 51-я страница списка — для замера глубокой прокрутки
+            for _ in range(50):
+                page = fetch_ticket_page(db, self.admin, after=self.deep_after)
+                if not page:
+                    break
+                self.deep_after = page[-1]
+
+        def report_file(report_format, cache=None):
+            generator = ReportGenerator(self.admin, *self.month, cache=cache)
+            path = os.path.join(self.temp_dir, f"report.{report_format.lower()}")
+            return generator.generate(report_format, path)
+
+        cache = ReportCache(os.path.join(self.temp_dir, "cache"))
+
+        def users(**kwargs):
+            with session_scope() as db:
+                return fetch_user_page(db, **kwargs)
+
+        def summary(start, end):
+            with session_scope() as db:
+                return report_summary(db, self.admin, start, end)
+
+        def search(text):
+            with session_scope() as db:
+                return search_tickets(db, self.admin, text)
+
+        return {
+            "tickets.first_page[admin]": lambda: tickets(self.admin),
+            "tickets.page_51[admin]": lambda: tickets(self.admin, after=self.deep_after),
+            "tickets.first_page[client]": lambda: tickets(self.client),
+            "tickets.in_progress[technician]": lambda: tickets(self.technician, status=TicketStatus.IN_PROGRESS),
+            "tickets.status_day[admin]": lambda: tickets(self.admin, status=TicketStatus.OPEN, date=self.day),
+            "tickets.search[admin]": lambda: search("принтер"),
+            "report.get_tickets[month]": lambda: ReportGenerator(self.admin, *self.month).get_tickets(),
+            "report.summary[year]": lambda: summary(self.day - timedelta(days=365), self.day),
+            "report.csv[month]": lambda: report_file("CSV"),
+            "report.excel[month]": lambda: report_file("Excel"),
+            "report.pdf[month]": lambda: report_file("PDF"),
+            # Первый (прогревочный) прогон кладет отчет в кэш, замеряется попадание
+            "report.pdf[month, cached]": lambda: report_file("PDF", cache),
+            "auth.authenticate_user": lambda: authenticate_user(DEMO_CLIENT, DEMO_PASSWORD),
+            "users.first_page[by name]": lambda: users(sort_column=2),
+            "users.search": lambda: users(search="Иван"),
+        }
+
+
+def measure(operation, repeat):
+    """(медиана мс, минимум мс, пик КиБ) — время без трассировки, память отдельным прогоном"""
+    operation()  # Прогрев: кэши страниц БД, ленивые импорты
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(timings), min(timings), peak / 1024
+
+
+def load_baselines():
+    if BASELINES_PATH.exists():
+        return json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+    return {}
+
+
+def compare(result, baseline, tolerance):
+    """Список описаний регрессий операции относительно базовой линии"""
+    problems = []
+    if baseline is None:
+        return problems
+    if (result["median_ms"] > baseline["median_ms"] * (1 + tolerance)
+            and result["median_ms"] - baseline["median_ms"] > MIN_DELTA_MS):
+        problems.append(f"время {result['median_ms']:.1f} мс > {baseline['median_ms']:.1f} мс")
+    if (result["peak_kib"] > baseline["peak_kib"] * (1 + tolerance)
+            and result["peak_kib"] - baseline["peak_kib"] > MIN_DELTA_KIB):
+        problems.append(f"память {result['peak_kib']:.0f} КиБ > {baseline['peak_kib']:.0f} КиБ")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки путей данных")
+    parser.add_argument("--size", default="1k", help="Размер набора: 1k, 100k или 1m")
+    parser.add_argument("--database-url", help="По умолчанию — SQLite в benchmarks/.data/")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="Замерять только операции, содержащие подстроку")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Допустимое ухудшение (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    # URL нужно выставить до первого импорта database
+    if args.database_url is None:
+        DATA_DIR.mkdir(exist_ok=True)
+        args.database_url = f"sqlite:///{DATA_DIR / f'bench_{args.size}.db'}"
+    os.environ["SUPPORT_DATABASE_URL"] = args.database_url
+
+    from database import engine, session_scope
+    from models import User, UserRole
+    from benchmarks import dataset
+
+    if args.size not in dataset.SIZES:
+        raise SystemExit(f"Неизвестный размер {args.size}; доступны: {', '.join(dataset.SIZES)}")
+    expected = dataset.SIZES[args.size]
+    existing = dataset.ticket_count(engine)
+    if existing == 0:
+        print(f"Заполнение базы: {expected} заявок…")
+        started = time.perf_counter()
+        dataset.seed(engine, expected)
+        print(f"  готово за {time.perf_counter() - started:.1f} с")
+    elif existing != expected:
+        raise SystemExit(f"В базе {existing} заявок, а не {expected} — укажите пустую базу")
+
+    with session_scope() as db:
+        users = tuple(
+            db.query(User).filter(User.role == role).order_by(User.id).first()
+            for role in (UserRole.ADMIN, UserRole.TECHNICIAN, UserRole.CLIENT)
+        )
+    day = (dataset.DATASET_END - timedelta(days=30)).date()
+
+    key = f"{engine.dialect.name}/{args.size}"
+    baselines = load_baselines()
+    baseline = baselines.get(key, {})
+    results = {}
+    regressions = 0
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        operations = Benchmarks(users, day, temp_dir).operations()
+        print(f"{'операция':34} {'медиана, мс':>12} {'мин, мс':>10} {'пик, КиБ':>10}")
+        for name, operation in operations.items():
+            if args.only and args.only not in name:
+                continue
+            median_ms, min_ms, peak_kib = measure(operation, args.repeat)
+            results[name] = {"median_ms": round(median_ms, 2), "peak_kib": round(peak_kib, 1)}
+            problems = compare(results[name], baseline.get(name), args.tolerance)
+            regressions += bool(problems)
+            marker = f"  РЕГРЕССИЯ: {'; '.join(problems)}" if problems else ""
+            print(f"{name:34} {median_ms:12.1f} {min_ms:10.1f} {peak_kib:10.0f}{marker}")
+
+    if args.save_baseline:
+        baselines[key] = {**baseline, **results}
+        BASELINES_PATH.write_text(
+            json.dumps(baselines, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+        print(f"Базовая линия {key} сохранена в {BASELINES_PATH.name}")
+    elif not baseline:
+        print(f"Базовой линии для {key} нет — запустите с --save-baseline")
+
+    raise SystemExit(1 if regressions and not args.save_baseline else 0)
+
+
+if __name__ == "__main__":
+    main()
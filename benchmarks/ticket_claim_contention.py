@@ -0,0 +1,159 @@
+"""Одновременное взятие заявок техниками (только PostgreSQL).
+
+Скрипт создает свободные тестовые заявки, и несколько потоков-техников одновременно пытаются
+взять каждую из них в случайном порядке. Сначала старым способом (чтение, проверка
+technician_id в Python, запись), затем условным UPDATE из ticket_actions.claim_tickets.
+Печатает число двойных назначений и пропускную способность; тестовые заявки затем удаляются.
+Код выхода 1, если двойное назначение допустил условный UPDATE — старый способ их ожидаемо допускает.
+Запуск из корня проекта на тестовой базе с хотя бы одним техником:
+
+    python -m benchmarks.ticket_claim_contention --threads 16 --tickets 500
+"""
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import create_engine, delete, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from database import DATABASE_URL, engine_options
+from models import Ticket, TicketDailyStat, TicketHistory, TicketStatus, User, UserRole
+from ticket_actions import claim_tickets
+from ticket_history import history_rows, write_history
+from ticket_queries import created_between
+from ticket_rollup import apply_contributions
+
+# Тестовые заявки создаются «в прошлом», чтобы после удаления пересчитать сводку только за этот день
+BENCH_DAY = date(2000, 1, 1)
+BENCH_TITLE = "claim-contention-benchmark"
+
+
+def claim_read_modify_write(db, ticket_id, technician_id):
+    """Прежний assign_ticket: между проверкой и записью заявку может взять другой техник"""
+    row = db.execute(select(Ticket.technician_id, Ticket.status).where(Ticket.id == ticket_id)).first()
+    if row is None or row.technician_id is not None:
+        return []
+    db.execute(
+        update(Ticket).where(Ticket.id == ticket_id)
+        .values(technician_id=technician_id, status=TicketStatus.IN_PROGRESS)
+    )
+    write_history(db, history_rows(ticket_id, [
+        ("technician_id", None, technician_id),
+        ("status", row.status, TicketStatus.IN_PROGRESS),
+    ], technician_id))
+    return [ticket_id]
+
+
+def claim_conditional(db, ticket_id, technician_id):
+    return claim_tickets(db, [ticket_id], technician_id)
+
+
+def create_tickets(bind, count):
+    with bind.begin() as conn:
+        conn.execute(insert(Ticket), [
+            {"title": BENCH_TITLE, "status": TicketStatus.OPEN, "priority": "medium", "created_at": BENCH_DAY}
+            for _ in range(count)
+        ])
+        ids = conn.execute(select(Ticket.id).where(Ticket.title == BENCH_TITLE)).scalars().all()
+        apply_contributions(conn, Ticket.id.in_(ids), 1)
+    return ids
+
+
+def drop_tickets(bind):
+    bench = Ticket.title == BENCH_TITLE
+    with bind.begin() as conn:
+        conn.execute(delete(TicketHistory).where(TicketHistory.ticket_id.in_(select(Ticket.id).where(bench))))
+        conn.execute(delete(Ticket).where(bench))
+        # Старый способ сводку не поддерживал — пересчитываем тестовый день целиком
+        conn.execute(delete(TicketDailyStat).where(TicketDailyStat.day == BENCH_DAY))
+        apply_contributions(conn, created_between(BENCH_DAY), 1)
+
+
+def run(Session, claim, ticket_ids, technician_ids, threads):
+    """Все потоки стартуют одновременно; возвращает (взятия по заявкам, ошибки, секунды)"""
+    claimed = Counter()
+    errors = Counter()
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def technician(technician_id):
+        order = ticket_ids[:]
+        random.shuffle(order)
+        barrier.wait()
+        for ticket_id in order:
+            try:
+                with Session() as db, db.begin():
+                    result = claim(db, ticket_id, technician_id)
+            except Exception as e:
+                with lock:
+                    errors[type(e).__name__] += 1
+                continue
+            with lock:
+                claimed.update(result)
+
+    workers = [
+        threading.Thread(target=technician, args=(technician_ids[i % len(technician_ids)],))
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return claimed, errors, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Конкурентное взятие заявок техниками")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--tickets", type=int, default=500)
+    args = parser.parse_args()
+
+    bind = create_engine(DATABASE_URL, **{
+        **engine_options(DATABASE_URL), "pool_size": args.threads, "max_overflow": 0
+    })
+    if bind.dialect.name != "postgresql":
+        raise SystemExit("Тест конкурентного доступа поддерживается только для PostgreSQL")
+    Session = sessionmaker(bind=bind, expire_on_commit=False)
+
+    with bind.connect() as conn:
+        technician_ids = conn.execute(
+            select(User.id).where(User.role == UserRole.TECHNICIAN)
+        ).scalars().all()
+    if not technician_ids:
+        raise SystemExit("В базе нет техников — сначала заполните ее тестовыми данными")
+
+    # (функция взятия, должна ли исключать двойные назначения)
+    strategies = {
+        "Чтение-проверка-запись": (claim_read_modify_write, False),
+        "Условный UPDATE": (claim_conditional, True),
+    }
+    failed = []
+    try:
+        for name, (claim, exclusive) in strategies.items():
+            drop_tickets(bind)
+            ticket_ids = create_tickets(bind, args.tickets)
+            claimed, errors, seconds = run(Session, claim, ticket_ids, technician_ids, args.threads)
+            attempts = args.threads * len(ticket_ids)
+            print(name)
+            print(f"  взято заявок:       {len(claimed)} из {len(ticket_ids)}")
+            double = sum(claimed.values()) - len(claimed)
+            print(f"  двойных назначений: {double}")
+            print(f"  попыток в секунду:  {attempts / seconds:9.0f}  ({seconds:.2f} с)")
+            if errors:
+                print(f"  ошибки:             {dict(errors)}")
+            if exclusive and double:
+                failed.append(name)
+    finally:
+        drop_tickets(bind)
+        bind.dispose()
+    if failed:
+        raise SystemExit(f"Двойные назначения при стратегии: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
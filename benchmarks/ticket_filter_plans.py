@@ -0,0 +1,112 @@
+"""Сравнение планов запросов к tickets до и после индексов (только PostgreSQL).
+
+Скрипт удаляет индексы tickets, снимает EXPLAIN ANALYZE для старых фильтров
+(func.date(created_at) == день), затем создает индексы и снимает планы для
+полуоткрытых интервалов. Запуск из корня проекта на заполненной базе:
+
+    python -m benchmarks.ticket_filter_plans
+"""
+import json
+
+from sqlalchemy import func, select, text
+
+from database import engine
+from models import Ticket, TicketStatus
+from ticket_queries import created_between
+
+PAGE_SIZE = 200
+
+
+def scan_nodes(plan):
+    """Типы узлов сканирования таблицы tickets в дереве плана"""
+    nodes = []
+    if plan.get("Relation Name") == "tickets":
+        nodes.append(f"{plan['Node Type']} ({plan.get('Index Name', '-')})")
+    for child in plan.get("Plans", []):
+        nodes.extend(scan_nodes(child))
+    return nodes
+
+
+def explain(conn, statement):
+    compiled = statement.compile(dialect=engine.dialect)
+    result = conn.exec_driver_sql(
+        "EXPLAIN (ANALYZE, FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(result, str):
+        result = json.loads(result)
+    return scan_nodes(result[0]["Plan"]), result[0]["Execution Time"]
+
+
+def sample_values(conn):
+    row = conn.execute(
+        select(Ticket.client_id, Ticket.created_at)
+        .where(Ticket.client_id.isnot(None))
+        .order_by(Ticket.created_at.desc())
+        .limit(1)
+    ).first()
+    if row is None:
+        raise SystemExit("Таблица tickets пуста — сначала заполните базу тестовыми данными")
+    technician_id = conn.execute(
+        select(Ticket.technician_id).where(Ticket.technician_id.isnot(None)).limit(1)
+    ).scalar()
+    return row.client_id, technician_id, row.created_at.date()
+
+
+def cases(client_id, technician_id, day):
+    """Пары (старый, новый) запрос для каждого сценария доступа"""
+    columns = (Ticket.id, Ticket.title, Ticket.status, Ticket.created_at)
+    newest_first = (Ticket.created_at.desc(), Ticket.id.desc())
+    old_day = func.date(Ticket.created_at) == day
+    new_day = created_between(day)
+
+    def page(*conditions):
+        return select(*columns).where(*conditions).order_by(*newest_first).limit(PAGE_SIZE)
+
+    return {
+        "Заявки клиента за день": (
+            page(Ticket.client_id == client_id, old_day),
+            page(Ticket.client_id == client_id, new_day),
+        ),
+        "Заявки техника по статусу": (
+            page(Ticket.technician_id == technician_id, Ticket.status == TicketStatus.IN_PROGRESS),
+            page(Ticket.technician_id == technician_id, Ticket.status == TicketStatus.IN_PROGRESS),
+        ),
+        "Статус + дата": (
+            page(Ticket.status == TicketStatus.OPEN, old_day),
+            page(Ticket.status == TicketStatus.OPEN, new_day),
+        ),
+        "Все заявки за день": (
+            page(old_day),
+            page(new_day),
+        ),
+    }
+
+
+def main():
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Сравнение планов поддерживается только для PostgreSQL")
+
+    indexes = Ticket.__table__.indexes
+    with engine.begin() as conn:
+        client_id, technician_id, day = sample_values(conn)
+        scenarios = cases(client_id, technician_id, day)
+
+        for index in indexes:
+            index.drop(bind=conn, checkfirst=True)
+        conn.execute(text("ANALYZE tickets"))
+        before = {name: explain(conn, old) for name, (old, _) in scenarios.items()}
+
+        for index in indexes:
+            index.create(bind=conn, checkfirst=True)
+        conn.execute(text("ANALYZE tickets"))
+        after = {name: explain(conn, new) for name, (_, new) in scenarios.items()}
+
+    for name in scenarios:
+        (before_nodes, before_ms), (after_nodes, after_ms) = before[name], after[name]
+        print(name)
+        print(f"  до:    {before_ms:9.2f} мс  {', '.join(before_nodes)}")
+        print(f"  после: {after_ms:9.2f} мс  {', '.join(after_nodes)}")
+
+
+if __name__ == "__main__":
+    main()
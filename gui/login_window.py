@@ -1,13 +1,24 @@
+import importlib
+
 from PyQt6.QtWidgets import QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QMessageBox, QFormLayout, QTabWidget
-from gui.main_window import MainWindow
-from auth import authenticate_user, register_user
-from models import UserRole
+from PyQt6.QtCore import QThreadPool
+from gui.workers import Worker
+
+
+def prepare_login():
+    """Фоновая подготовка входа, пока пользователь вводит логин: загрузка ORM и bcrypt,
+    создание engine и соединения с БД. Окно входа само их не импортирует, чтобы появиться быстрее."""
+    importlib.import_module("auth")
+    from database import PREWARM_CONNECTIONS, prewarm_pool
+    return prewarm_pool() if PREWARM_CONNECTIONS else 0
 
 
 class LoginWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.main_window = None
+        self.pending = None  # Текущая фоновая проверка пароля / регистрация
+        self.prewarm = None
         self.initUI()
         self.set_style()  # Применяем стили
 
@@ -119,13 +130,16 @@ class LoginWindow(QWidget):
         self.login_username = QLineEdit()
         self.login_password = QLineEdit()
         self.login_password.setEchoMode(QLineEdit.EchoMode.Password)
-        login_btn = QPushButton('Войти')
-        login_btn.clicked.connect(self.handle_login)
+        self.login_btn = QPushButton('Войти')
+        self.login_btn.clicked.connect(self.handle_login)
+        self.login_password.returnPressed.connect(self.handle_login)
+        self.login_username.textEdited.connect(self.start_prewarm)
+        self.login_password.textEdited.connect(self.start_prewarm)
         login_layout.addWidget(QLabel('Логин:'))
         login_layout.addWidget(self.login_username)
         login_layout.addWidget(QLabel('Пароль:'))
         login_layout.addWidget(self.login_password)
-        login_layout.addWidget(login_btn)
+        login_layout.addWidget(self.login_btn)
         login_tab.setLayout(login_layout)
         register_tab = QWidget()
         register_layout = QFormLayout()
@@ -133,12 +147,12 @@ class LoginWindow(QWidget):
         self.reg_password = QLineEdit()
         self.reg_password.setEchoMode(QLineEdit.EchoMode.Password)
         self.reg_fullname = QLineEdit()
-        register_btn = QPushButton('Зарегистрироваться')
-        register_btn.clicked.connect(self.handle_register)
+        self.register_btn = QPushButton('Зарегистрироваться')
+        self.register_btn.clicked.connect(self.handle_register)
         register_layout.addRow('Логин:', self.reg_username)
         register_layout.addRow('Пароль:', self.reg_password)
         register_layout.addRow('Полное имя:', self.reg_fullname)
-        register_layout.addRow(register_btn)
+        register_layout.addRow(self.register_btn)
         register_tab.setLayout(register_layout)
         tabs.addTab(login_tab, "Вход")
         tabs.addTab(register_tab, "Регистрация")
@@ -146,12 +160,45 @@ class LoginWindow(QWidget):
         main_layout.addWidget(tabs)
         self.setLayout(main_layout)
 
+    def start_prewarm(self):
+        """Один раз за запуск: при первом вводе в поля входа. Ошибку подключения покажет сам вход"""
+        if self.prewarm is not None:
+            return
+        self.prewarm = Worker(prepare_login)
+        QThreadPool.globalInstance().start(self.prewarm)
+
+    def run_in_background(self, fn, *args, on_finished, on_failed):
+        """bcrypt занимает сотни миллисекунд — выполняем его вне потока интерфейса"""
+        self.set_busy(True)
+        self.pending = Worker(fn, *args)
+        self.pending.signals.finished.connect(on_finished)
+        self.pending.signals.failed.connect(on_failed)
+        QThreadPool.globalInstance().start(self.pending)
+
+    def set_busy(self, busy):
+        self.login_btn.setEnabled(not busy)
+        self.register_btn.setEnabled(not busy)
+        self.login_btn.setText('Проверка…' if busy else 'Войти')
+
     def handle_login(self):
+        if self.pending is not None:
+            return
+        from auth import authenticate_user  # Обычно уже загружен в prepare_login
+
+        username = self.login_username.text()
+        password = self.login_password.text()
+        self.run_in_background(
+            authenticate_user, username, password,
+            on_finished=self.on_login_finished,
+            on_failed=self.on_login_failed
+        )
+
+    def on_login_finished(self, worker, user):
+        self.pending = None
+        self.set_busy(False)
         try:
-            username = self.login_username.text()
-            password = self.login_password.text()
-            user = authenticate_user(username, password)
             if user:
+                from gui.main_window import MainWindow
                 self.main_window = MainWindow(user)
                 self.main_window.show()
                 self.hide()
@@ -162,27 +209,46 @@ class LoginWindow(QWidget):
             import traceback
             print(traceback.format_exc())
 
-    def handle_register(self):
-        try:
-            username = self.reg_username.text()
-            password = self.reg_password.text()
-            fullname = self.reg_fullname.text()
-
-            if not all([username, password, fullname]):
-                QMessageBox.warning(self, 'Ошибка', 'Все поля обязательны')
-                return
-
-            user = register_user(username, password, fullname, UserRole.CLIENT)
-            if user:
-                QMessageBox.information(self, 'Успех', 'Регистрация завершена')
-                self.login_username.setText(username)
-                # Переключаем на вкладку входа
-                for i in range(self.layout().count()):
-                    if isinstance(self.layout().itemAt(i).widget(), QTabWidget):
-                        self.layout().itemAt(i).widget().setCurrentIndex(0)
-                        break
-            else:
-                QMessageBox.warning(self, 'Ошибка', 'Пользователь уже существует')
+    def on_login_failed(self, worker, message):
+        self.pending = None
+        self.set_busy(False)
+        QMessageBox.critical(self, 'Ошибка', f'Ошибка авторизации: {message}')
 
-        except Exception as e:
-            QMessageBox.critical(self, 'Ошибка', f'Ошибка регистрации: {str(e)}')
+    def handle_register(self):
+        if self.pending is not None:
+            return
+        from auth import register_user
+        from models import UserRole
+
+        username = self.reg_username.text()
+        password = self.reg_password.text()
+        fullname = self.reg_fullname.text()
+
+        if not all([username, password, fullname]):
+            QMessageBox.warning(self, 'Ошибка', 'Все поля обязательны')
+            return
+
+        self.run_in_background(
+            register_user, username, password, fullname, UserRole.CLIENT,
+            on_finished=self.on_register_finished,
+            on_failed=self.on_register_failed
+        )
+
+    def on_register_finished(self, worker, user):
+        self.pending = None
+        self.set_busy(False)
+        if user:
+            QMessageBox.information(self, 'Успех', 'Регистрация завершена')
+            self.login_username.setText(self.reg_username.text())
+            # Переключаем на вкладку входа
+            for i in range(self.layout().count()):
+                if isinstance(self.layout().itemAt(i).widget(), QTabWidget):
+                    self.layout().itemAt(i).widget().setCurrentIndex(0)
+                    break
+        else:
+            QMessageBox.warning(self, 'Ошибка', 'Пользователь уже существует')
+
+    def on_register_failed(self, worker, message):
+        self.pending = None
+        self.set_busy(False)
+        QMessageBox.critical(self, 'Ошибка', f'Ошибка регистрации: {message}')
@@ -1,29 +1,50 @@
-from PyQt6.QtGui import QColor, QIcon
+from functools import partial
+
+from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import (
-    QMainWindow, QTableWidget, QTableWidgetItem, QHeaderView,
+    QMainWindow, QTableView, QHeaderView,
     QPushButton, QToolBar, QStatusBar, QWidget, QVBoxLayout,
-    QComboBox, QHBoxLayout, QDateEdit, QLabel, QMessageBox, QDialog
+    QComboBox, QHBoxLayout, QDateEdit, QLabel, QMessageBox, QDialog, QLineEdit, QInputDialog
 )
-from PyQt6.QtCore import Qt, QDate, QPropertyAnimation
-from sqlalchemy import func
-
-from database import get_db
-from models import Ticket, TicketStatus, UserRole
+from PyQt6.QtCore import Qt, QDate, QPropertyAnimation, QTimer, QThreadPool
+from sqlalchemy.orm import undefer
+
+from database import pool_metrics, query_stats, session_scope, sql_action
+from models import Ticket, TicketStatus, User, UserRole
+from ticket_actions import bulk_update, claim_tickets
+from ticket_queries import fetch_ticket_page
+from ticket_replica import open_replica
+from ticket_search import search_tickets
 from ticket_dialog import TicketDialog
 
-from gui.user_management import UserManagementDialog
-
-from report_dialog import ReportDialog
-from report_generator import ReportGenerator
+from gui.ticket_table import TicketTableModel, TicketItemDelegate
+from gui.ticket_sync import TicketSync
+from gui.workers import Worker
 
 
 class MainWindow(QMainWindow):
+    FILTER_DEBOUNCE_MS = 300
+    SQL_STATS_INTERVAL_MS = 1000
+    REPLICA_RETRY_MS = 15000  # Как часто офлайн пробовать снова связаться с сервером
+
     def __init__(self, user):
         super().__init__()
         self.user = user
+        self.report_dialog = None
+        self.current_filters = (None, None)
+        self.current_search = ""
+        self.bulk_worker = None
+        # Локальная копия заявок: список показывается из нее сразу, пока идет синхронизация
+        self.replica = open_replica(self.user)
+        self.replica_worker = None
+        self.replica_reload = False  # Перечитать список после ближайшей синхронизации копии
+        self.replica_sync_again = False
+        self.offline = False
         self.initUI()
         self.load_tickets()
         self.init_admin_tools()
+        if self.replica is not None:
+            self.sync_replica()
 
     def init_admin_tools(self):
         if self.user.role == UserRole.ADMIN:
@@ -49,33 +70,16 @@ class MainWindow(QMainWindow):
             toolbar.addWidget(report_btn)
 
     def open_report_dialog(self):
-        dialog = ReportDialog(self.user)
-        if dialog.exec():
-            start_date = dialog.start_date.date().toPyDate()
-            end_date = dialog.end_date.date().toPyDate()
-            report_format = dialog.format_combo.currentText()
-
-            generator = ReportGenerator(self.user, start_date, end_date)
-            tickets = generator.get_tickets()
-
-            if not tickets:
-                QMessageBox.warning(self, "Ошибка", "Нет данных для выбранного периода")
-                return
-
-            if report_format == "PDF":
-                generator.generate_pdf(tickets)
-            elif report_format == "Excel":
-                generator.generate_excel(tickets)
-            else:
-                generator.generate_csv(tickets)
-
-            QMessageBox.information(
-                self,
-                "Успех",
-                f"Отчет сохранен как: {generator.filename}"
-            )
+        # Отчет формируется в фоне самим диалогом; окно немодальное, работа с заявками не блокируется
+        if self.report_dialog is not None and self.report_dialog.isVisible():
+            self.report_dialog.activateWindow()
+            return
+        from report_dialog import ReportDialog  # Диалоги открываются редко — загружаем при первом открытии
+        self.report_dialog = ReportDialog(self.user, self)
+        self.report_dialog.show()
 
     def open_user_management(self):
+        from gui.user_management import UserManagementDialog
         dialog = UserManagementDialog(self.user)
         dialog.exec()
 
@@ -88,22 +92,21 @@ class MainWindow(QMainWindow):
 
         try:
             # Получаем ID заявки из первого столбца выбранной строки
-            ticket_id = int(self.table.item(selected[0].row(), 0).text())
+            ticket_id = self.ticket_model.ticket_id(selected[0].row())
 
-            # Создаем новую сессию БД
-            db = next(get_db())
+            # Получаем заявку из БД вместе с отложенным описанием
+            with sql_action("open_ticket"), session_scope() as db:
+                ticket = db.query(Ticket).options(undefer(Ticket.description)).get(ticket_id)
+                if ticket:
+                    db.expunge(ticket)  # Отвязываем оригинальный объект от сессии
 
-            # Получаем заявку из БД
-            ticket = db.query(Ticket).get(ticket_id)
             if not ticket:
                 QMessageBox.warning(self, "Ошибка", "Заявка не найдена")
-                db.close()
                 return
 
             # Проверяем, является ли текущий пользователь владельцем заявки (для CLIENT)
             if self.user.role == UserRole.CLIENT and ticket.client_id != self.user.id:
                 QMessageBox.warning(self, "Ошибка", "Вы не можете редактировать чужую заявку!")
-                db.close()
                 return
 
             # Создаем копию данных для редактирования
@@ -116,10 +119,9 @@ class MainWindow(QMainWindow):
                 'client_id': ticket.client_id,
                 'technician_id': ticket.technician_id,
                 'created_at': ticket.created_at,
-                'updated_at': ticket.updated_at
+                'updated_at': ticket.updated_at,
+                'version': ticket.version
             }
-            db.expunge(ticket)  # Отвязываем оригинальный объект от сессии
-            db.close()
 
             # Создаем новый объект для редактирования
             ticket_to_edit = Ticket(**ticket_data)
@@ -127,14 +129,12 @@ class MainWindow(QMainWindow):
             # Открываем диалог редактирования
             dialog = TicketDialog(self.user, ticket_to_edit)
             if dialog.exec() == QDialog.DialogCode.Accepted:
-                self.load_tickets()
+                self.ticket_sync.sync_now()
 
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось открыть заявку для редактирования:\n{str(e)}")
             import traceback
             print(traceback.format_exc())
-            if 'db' in locals():  # Закрываем сессию, если она есть
-                db.close()
 
     def set_style(self):
         self.setStyleSheet("""
@@ -190,7 +190,7 @@ class MainWindow(QMainWindow):
             }
 
             /* Таблица */
-            QTableWidget {
+            QTableView {
                 background-color: #1f2329;
                 border: 1px solid #2d3239;
                 border-radius: 6px;
@@ -205,12 +205,12 @@ class MainWindow(QMainWindow):
                 padding: 8px;
             }
 
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 border-bottom: 1px solid #2d3239;
             }
 
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3a6fb0;
                 color: #ffffff;
             }
@@ -287,21 +287,37 @@ class MainWindow(QMainWindow):
         self.setWindowTitle('Система управления заявками')
         self.setGeometry(100, 100, 800, 600)
 
-        # Таблица заявок
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels([ 'ID', 'Заголовок', 'Статус', 'Приоритет', 'Дата создания', 'Техник' ])
+        # Таблица заявок: строки подгружаются страницами при прокрутке
+        self.ticket_model = TicketTableModel(self.user.id)
+        self.table = QTableView()
+        self.table.setModel(self.ticket_model)
+        self.table.setItemDelegate(TicketItemDelegate(self.table))
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.ticket_model.loadingChanged.connect(self.on_tickets_loading)
+        self.ticket_model.loadFailed.connect(self.on_tickets_load_failed)
+
+        # Быстрые изменения фильтров схлопываются в одну перезагрузку
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(self.FILTER_DEBOUNCE_MS)
+        self.reload_timer.timeout.connect(self.load_tickets)
+
+        # Точечная догрузка изменений вместо полной перезагрузки списка
+        self.ticket_sync = TicketSync(self.user, self)
+        self.ticket_sync.changesReady.connect(self.on_remote_changes)
+        self.ticket_sync.resyncNeeded.connect(self.on_resync_needed)
 
         # Панель инструментов
         toolbar = QToolBar()
         self.addToolBar(toolbar)
 
         # Кнопка "Редактировать"
-        edit_btn = QPushButton('Редактировать')
-        edit_btn.setIcon(QIcon('icons/draw.png'))
-        edit_btn.clicked.connect(self.open_edit_dialog)
-        toolbar.addWidget(edit_btn)
+        self.edit_btn = QPushButton('Редактировать')
+        self.edit_btn.setIcon(QIcon('icons/draw.png'))
+        self.edit_btn.clicked.connect(self.open_edit_dialog)
+        toolbar.addWidget(self.edit_btn)
 
         # Кнопка "Новая заявка"
         self.new_ticket_btn = QPushButton('Новая заявка')
@@ -315,6 +331,20 @@ class MainWindow(QMainWindow):
             self.assign_btn.clicked.connect(self.assign_ticket)
             toolbar.addWidget(self.assign_btn)
 
+        # Массовые действия над всеми выделенными заявками
+        if self.user.role in (UserRole.TECHNICIAN, UserRole.ADMIN):
+            self.bulk_buttons = []
+            for title, handler in (
+                ("Назначить…", self.bulk_assign),
+                ("Статус…", self.bulk_set_status),
+                ("Приоритет…", self.bulk_set_priority),
+                ("Закрыть", self.bulk_close),
+            ):
+                button = QPushButton(title)
+                button.clicked.connect(handler)
+                toolbar.addWidget(button)
+                self.bulk_buttons.append(button)
+
         # Центральный виджет
         central_widget = QWidget()
         layout = QVBoxLayout()
@@ -323,6 +353,26 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(central_widget)
 
         # Статус бар
+        self.loading_label = QLabel('Загрузка заявок…')
+        self.loading_label.hide()
+        self.statusBar().addPermanentWidget(self.loading_label)
+
+        # Без связи с сервером список показывается из локальной копии только для чтения
+        self.offline_label = QLabel()
+        self.offline_label.setStyleSheet("color: #BF616A; font-weight: bold;")
+        self.offline_label.hide()
+        self.statusBar().addPermanentWidget(self.offline_label)
+        self.replica_retry_timer = QTimer(self)
+        self.replica_retry_timer.setInterval(self.REPLICA_RETRY_MS)
+        self.replica_retry_timer.timeout.connect(self.sync_replica)
+
+        # Последнее действие и его запросы; подробности — во всплывающей подсказке
+        self.sql_label = QLabel()
+        self.statusBar().addPermanentWidget(self.sql_label)
+        self.sql_stats_timer = QTimer(self)
+        self.sql_stats_timer.setInterval(self.SQL_STATS_INTERVAL_MS)
+        self.sql_stats_timer.timeout.connect(self.show_sql_stats)
+        self.sql_stats_timer.start()
         self.statusBar().showMessage(f'Вход выполнен как: {self.user.full_name} ({self.user.role})')
         self.setup_filters()
         self.set_style()
@@ -333,119 +383,291 @@ class MainWindow(QMainWindow):
         if not selected:
             return
 
-        ticket_id = int(self.table.item(selected[0].row(), 0).text())
-        db = next(get_db())
-        ticket = db.query(Ticket).get(ticket_id)
+        ticket_id = self.ticket_model.ticket_id(selected[0].row())
+        # Условный UPDATE: из двух техников, взявших заявку одновременно, успеет только один
+        with sql_action("claim_ticket"), session_scope() as db:
+            claimed = claim_tickets(db, [ticket_id], self.user.id)
 
-        if ticket.technician_id:
+        if not claimed:
             QMessageBox.warning(self, "Ошибка", "Заявка уже назначена")
             return
 
-        ticket.technician_id = self.user.id
-        ticket.status = TicketStatus.IN_PROGRESS
-        db.commit()
-
-        self.load_tickets()
+        self.ticket_sync.sync_now()
         QMessageBox.information(self, "Успех", "Вы взяли заявку!")
 
+    def selected_ticket_ids(self):
+        return [self.ticket_model.ticket_id(index.row()) for index in self.table.selectionModel().selectedRows()]
+
+    def bulk_assign(self):
+        if self.user.role == UserRole.TECHNICIAN:
+            # Техник берет себе только свободные заявки из выделенных
+            self.run_bulk_action(lambda db, ticket_ids: len(claim_tickets(db, ticket_ids, self.user.id)))
+            return
+
+        with session_scope() as db:
+            technicians = db.query(User.id, User.full_name).filter(
+                User.role == UserRole.TECHNICIAN
+            ).order_by(User.full_name).all()
+        if not technicians:
+            QMessageBox.warning(self, "Ошибка", "Нет ни одного техника")
+            return
+        names = [name for _, name in technicians]
+        name, ok = QInputDialog.getItem(self, "Назначить", "Техник:", names, 0, False)
+        if ok:
+            self.run_bulk_update({"technician_id": technicians[names.index(name)].id})
+
+    def bulk_set_status(self):
+        statuses = [s.value for s in TicketStatus]
+        value, ok = QInputDialog.getItem(self, "Статус", "Новый статус:", statuses, 0, False)
+        if ok:
+            self.run_bulk_update({"status": TicketStatus(value)})
+
+    def bulk_set_priority(self):
+        value, ok = QInputDialog.getItem(self, "Приоритет", "Новый приоритет:", ["low", "medium", "high"], 1, False)
+        if ok:
+            self.run_bulk_update({"priority": value})
+
+    def bulk_close(self):
+        self.run_bulk_update({"status": TicketStatus.CLOSED})
+
+    def run_bulk_update(self, values):
+        """Применяет values ко всем выделенным заявкам одной транзакцией в фоне"""
+        self.run_bulk_action(lambda db, ticket_ids: bulk_update(db, ticket_ids, values, self.user.id))
+
+    def run_bulk_action(self, action):
+        """action(db, ticket_ids) -> число измененных заявок; выполняется в фоне одной транзакцией"""
+        ticket_ids = self.selected_ticket_ids()
+        if not ticket_ids:
+            QMessageBox.warning(self, "Ошибка", "Выберите заявки")
+            return
+        if self.bulk_worker is not None:
+            return
+
+        def update_tickets():
+            with session_scope() as db:
+                return action(db, ticket_ids)
+
+        self.set_bulk_busy(True)
+        self.bulk_worker = Worker(update_tickets)
+        self.bulk_worker.signals.finished.connect(self.on_bulk_finished)
+        self.bulk_worker.signals.failed.connect(self.on_bulk_failed)
+        QThreadPool.globalInstance().start(self.bulk_worker)
+
+    def set_bulk_busy(self, busy):
+        for button in self.bulk_buttons:
+            button.setEnabled(not busy and not self.offline)
+
+    def on_bulk_finished(self, worker, changed):
+        self.bulk_worker = None
+        self.set_bulk_busy(False)
+        self.ticket_sync.sync_now()
+        self.statusBar().showMessage(f"Изменено заявок: {changed}", 3000)
+
+    def on_bulk_failed(self, worker, message):
+        self.bulk_worker = None
+        self.set_bulk_busy(False)
+        QMessageBox.critical(self, "Ошибка", f"Не удалось изменить заявки:\n{message}")
+
     def setup_filters(self):
         filter_widget = QWidget()
         layout = QHBoxLayout()
 
         self.status_filter = QComboBox()
         self.status_filter.addItems(["Все"] + [s.value for s in TicketStatus])
-        self.status_filter.currentTextChanged.connect(self.load_tickets)
+        self.status_filter.currentTextChanged.connect(self.schedule_reload)
 
         self.date_filter = QDateEdit()
         self.date_filter.setDate(QDate.currentDate())
-        self.date_filter.dateChanged.connect(self.load_tickets)
+        self.date_filter.dateChanged.connect(self.schedule_reload)
 
         layout.addWidget(QLabel("Статус:"))
         layout.addWidget(self.status_filter)
+        # Поиск по заголовку и описанию (по всем датам)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Поиск по заявкам…")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.schedule_reload)
+
         layout.addWidget(QLabel("Дата создания:"))
         layout.addWidget(self.date_filter)
+        layout.addWidget(self.search_input)
 
         filter_widget.setLayout(layout)
         self.table.parentWidget().layout().insertWidget(0, filter_widget)
 
-    def load_tickets(self):
-        try:
-            db = next(get_db())
-            query = db.query(Ticket)
-
-            # Применяем фильтры
-            if self.status_filter.currentText() != "Все":
-                status = TicketStatus(self.status_filter.currentText())
-                query = query.filter(Ticket.status == status)
-
-            if self.date_filter.date():
-                date = self.date_filter.date().toPyDate()
-                query = query.filter(func.date(Ticket.created_at) == date)
-
-            # Для клиентов показываем только их заявки
-            if self.user.role == UserRole.CLIENT:
-                query = query.filter(Ticket.client_id == self.user.id)
-
-            tickets = query.order_by(Ticket.created_at.desc()).all()
-
-            # Заполняем таблицу
-            self.table.setRowCount(len(tickets))
-            for row, ticket in enumerate(tickets):
-                # Основные данные
-                self.table.setItem(row, 0, QTableWidgetItem(str(ticket.id)))
-                self.table.setItem(row, 1, QTableWidgetItem(ticket.title))
-
-                # Статус с цветовым выделением
-                status_item = QTableWidgetItem(ticket.status.value)
-                if ticket.status == TicketStatus.OPEN:
-                    status_item.setBackground(QColor(255, 230, 230))  # Красный
-                elif ticket.status == TicketStatus.IN_PROGRESS:
-                    status_item.setBackground(QColor(255, 255, 200))  # Желтый
-                elif ticket.status == TicketStatus.CLOSED:
-                    status_item.setBackground(QColor(230, 255, 230))  # Зеленый
-                self.table.setItem(row, 2, status_item)
-
-                # Приоритет
-                priority_item = QTableWidgetItem(ticket.priority or "")
-                self.table.setItem(row, 3, priority_item)
-
-                # Дата создания
-                created_at = ticket.created_at.strftime("%d.%m.%Y %H:%M") if ticket.created_at else ""
-                self.table.setItem(row, 4, QTableWidgetItem(created_at))
-
-                # Техник с выделением "своих" заявок
-                technician_name = ticket.technician.full_name if ticket.technician else "Не назначен"
-                tech_item = QTableWidgetItem(technician_name)
-                if ticket.technician_id == self.user.id:
-                    tech_item.setBackground(QColor(220, 240, 255))  # Голубой
-                self.table.setItem(row, 5, tech_item)
-
-            # Автоматическое растягивание столбцов
-            self.table.resizeColumnsToContents()
-
-            # Статус бар
-            ticket_count = len(tickets)
-            message = f"Найдено заявок: {ticket_count}"
-            if self.user.role == UserRole.CLIENT:
-                message += f" (Ваших: {ticket_count})"
-            self.statusBar().showMessage(message, 3000)
+    def schedule_reload(self):
+        self.reload_timer.start()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить заявки: {str(e)}")
-            self.statusBar().showMessage("Ошибка загрузки данных", 5000)
-        finally:
-            db.close()
+    def load_tickets(self):
+        self.reload_timer.stop()
+        status = None
+        if self.status_filter.currentText() != "Все":
+            status = TicketStatus(self.status_filter.currentText())
+        date = self.date_filter.date().toPyDate() if self.date_filter.date() else None
+
+        search_text = self.search_input.text().strip()
+
+        # Запрос идет в фоне; модель отбросит ответы по устаревшим фильтрам
+        self.current_filters = (status, date)
+        self.current_search = search_text
+        self.ticket_sync.restart()
+        if search_text:
+            self.ticket_model.reset(partial(self.search_tickets_page, search_text, status))
+        elif self.replica is not None and self.replica.is_ready():
+            self.ticket_model.reset(partial(self.replica.fetch_page, status, date))
+        else:
+            self.ticket_model.reset(partial(self.fetch_tickets_page, status, date))
+        self.ticket_model.fetchMore()
+
+    def on_remote_changes(self, rows):
+        if self.replica is not None:
+            self.replica.store(rows)
+        self.apply_ticket_changes(rows)
+
+    def on_resync_needed(self):
+        """Изменений больше, чем догружает TicketSync, — список перечитывается целиком"""
+        if self.replica is None or not self.replica.is_ready():
+            self.load_tickets()
+            return
+        # Список читается из копии, а она этих изменений еще не видела: сначала синхронизация
+        self.replica_reload = True
+        if self.replica_worker is not None:
+            self.replica_sync_again = True  # Идущая синхронизация могла начаться до этих изменений
+        else:
+            self.sync_replica()
+
+    def sync_replica(self):
+        """Догружает изменения в локальную копию; неудача означает, что сервер недоступен"""
+        if self.replica_worker is not None:
+            return
+        self.replica_worker = Worker(self.replica.sync)
+        self.replica_worker.signals.finished.connect(self.on_replica_synced)
+        self.replica_worker.signals.failed.connect(self.on_replica_sync_failed)
+        QThreadPool.globalInstance().start(self.replica_worker)
+
+    def on_replica_synced(self, worker, rows):
+        self.replica_worker = None
+        reconnected = self.offline
+        self.set_offline(False)
+        if self.replica_sync_again:
+            self.replica_sync_again = False
+            self.replica_reload = True  # Изменения этого прохода попадут в список при перечитывании
+            self.sync_replica()
+            return
+        if self.replica_reload or reconnected or rows is None or self.ticket_model.rowCount() == 0:
+            # После офлайна, первой сборки копии или большого числа изменений проще перечитать список
+            self.replica_reload = False
+            self.load_tickets()
+        elif rows:
+            self.apply_ticket_changes(rows)
+
+    def on_replica_sync_failed(self, worker, message):
+        self.replica_worker = None
+        self.replica_sync_again = False  # Повторная попытка по таймеру догрузит все с водяного знака
+        self.set_offline(True)
+
+    def set_offline(self, offline):
+        """Офлайн: список из локальной копии, изменения заявок недоступны до восстановления связи"""
+        self.offline = offline
+        buttons = [self.edit_btn, self.new_ticket_btn]
+        if hasattr(self, "assign_btn"):
+            buttons.append(self.assign_btn)
+        for button in buttons:
+            button.setEnabled(not offline)
+        if hasattr(self, "bulk_buttons"):
+            self.set_bulk_busy(self.bulk_worker is not None)
+
+        if offline:
+            synced_at = self.replica.synced_at()
+            when = synced_at.astimezone().strftime("%d.%m.%Y %H:%M") if synced_at else "—"
+            self.offline_label.setText(f"Нет связи с сервером — только просмотр, данные на {when}")
+            self.replica_retry_timer.start()
+        else:
+            self.replica_retry_timer.stop()
+        self.offline_label.setVisible(offline)
+
+    def apply_ticket_changes(self, rows):
+        # Результаты поиска ранжированы и подсвечены — их не патчим, а обновим при следующем поиске
+        if self.current_search:
+            return
+        self.ticket_model.apply_changes(rows, self.matches_filters)
+
+    def matches_filters(self, row):
+        status, date = self.current_filters
+        if status is not None and row.status != status:
+            return False
+        if date is not None and (row.created_at is None or row.created_at.date() != date):
+            return False
+        return True
+
+    def closeEvent(self, event):
+        self.ticket_sync.stop()
+        super().closeEvent(event)
+
+    def on_tickets_loading(self, loading):
+        self.loading_label.setVisible(loading)
+        if not loading:
+            self.show_ticket_count()
+
+    def on_tickets_load_failed(self, message):
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить заявки: {message}")
+        self.statusBar().showMessage("Ошибка загрузки данных", 5000)
+
+    def fetch_tickets_page(self, status, date, after, limit):
+        """Загружает страницу заявок, следующих за строкой after (keyset-пагинация)"""
+        with session_scope() as db:
+            return fetch_ticket_page(db, self.user, status, date, after, limit)
+
+    def search_tickets_page(self, search_text, status, after, limit):
+        """Поиск отдает сразу лучшие совпадения одной страницей"""
+        if after is not None:
+            return []
+        with session_scope() as db:
+            return search_tickets(db, self.user, search_text, status)
+
+    def show_sql_stats(self):
+        last_action = query_stats.last_action
+        if last_action is None:
+            return
+        action, queries, total_ms = last_action
+        self.sql_label.setText(f"SQL {action}: {queries} запр., {total_ms:.0f} мс")
+
+        lines = [
+            f"{elapsed_ms:8.1f} мс  строк {rows if rows >= 0 else '?'}  [{name or '—'}]  {statement[:120]}"
+            for name, statement, elapsed_ms, rows in reversed(query_stats.recent_queries(15))
+        ]
+        if query_stats.slow_queries:
+            lines.append(f"Медленных запросов: {query_stats.slow_queries}")
+        for name, statement, repeats in list(query_stats.n_plus_one)[-3:]:
+            lines.append(f"Возможный N+1 в {name}: {repeats}× {statement[:80]}")
+
+        pool = pool_metrics.snapshot()
+        lines.append(
+            f"Пул: выдач {pool['checkouts']}, подключений {pool['connects']}, "
+            f"занято {pool['checked_out']} (пик {pool['peak_checked_out']}), "
+            f"ожидание ср. {pool['avg_wait_ms']:.1f} мс / макс. {pool['max_wait_ms']:.1f} мс"
+        )
+        lines.append(f"Состояние пула: {pool['pool']}")
+        self.sql_label.setToolTip("\n".join(lines))
+
+    def show_ticket_count(self):
+        ticket_count = self.ticket_model.rowCount()
+        count_text = f"{ticket_count}+" if self.ticket_model.has_more() else str(ticket_count)
+        message = f"Найдено заявок: {count_text}"
+        if self.user.role == UserRole.CLIENT:
+            message += f" (Ваших: {count_text})"
+        self.statusBar().showMessage(message, 3000)
 
     def open_new_ticket_dialog(self):
         dialog = TicketDialog(self.user)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             try:
-                self.load_tickets()  # Обновляем список заявок
+                self.ticket_sync.sync_now()  # Догружаем новую заявку без перезагрузки списка
                 self.statusBar().showMessage("Заявка успешно создана!", 3000)
 
-                # Прокручиваем таблицу к новой заявке
-                if self.table.rowCount() > 0:
-                    self.table.scrollToBottom()
+                # Новые заявки идут первыми — прокручиваем таблицу к началу
+                if self.ticket_model.rowCount() > 0:
+                    self.table.scrollToTop()
 
             except Exception as e:
                 QMessageBox.critical(self, "Ошибка",
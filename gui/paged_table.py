@@ -0,0 +1,121 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QThreadPool, pyqtSignal, pyqtSlot
+
+from gui.workers import Worker
+
+
+class PagedTableModel(QAbstractTableModel):
+    """Модель, подгружающая строки страницами в фоновом потоке по мере прокрутки.
+
+    Наследники задают HEADERS и _format(row) — кортеж строк для отображения, который
+    считается один раз при загрузке строки, а не при каждой отрисовке ячейки.
+    """
+
+    HEADERS = []
+    PAGE_SIZE = 200
+
+    loadingChanged = pyqtSignal(bool)
+    loadFailed = pyqtSignal(str)
+
+    def __init__(self, fetch_page=None, page_size=PAGE_SIZE):
+        super().__init__()
+        self.page_size = page_size
+        self._fetch_page = fetch_page
+        self._rows = []
+        self._display = []
+        self._exhausted = fetch_page is None
+        self._pending = None
+
+    def reset(self, fetch_page):
+        """Сбрасывает модель под новые фильтры; fetch_page(after, limit) возвращает страницу строк.
+
+        Незавершенная загрузка по старым фильтрам отменяется, ее результат отбрасывается.
+        """
+        self._cancel_pending()
+        self.beginResetModel()
+        self._fetch_page = fetch_page
+        self._rows = []
+        self._display = []
+        self._exhausted = False
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._exhausted and self._pending is None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+
+        after = self._rows[-1] if self._rows else None
+        worker = Worker(self._fetch_page, after, self.page_size)
+        worker.signals.finished.connect(self._on_page_loaded)
+        worker.signals.failed.connect(self._on_load_failed)
+        self._pending = worker
+        self.loadingChanged.emit(True)
+        QThreadPool.globalInstance().start(worker)
+
+    def is_loading(self):
+        return self._pending is not None
+
+    def has_more(self):
+        return not self._exhausted
+
+    @pyqtSlot(object, object)
+    def _on_page_loaded(self, worker, rows):
+        if worker is not self._pending:
+            return  # Результат запроса по устаревшим фильтрам
+        self._pending = None
+
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self._display.extend(self._format(row) for row in rows)
+            self.endInsertRows()
+        self.loadingChanged.emit(False)
+
+    @pyqtSlot(object, str)
+    def _on_load_failed(self, worker, message):
+        if worker is not self._pending:
+            return
+        self._pending = None
+        self._exhausted = True
+        self.loadingChanged.emit(False)
+        self.loadFailed.emit(message)
+
+    def _cancel_pending(self):
+        if self._pending is None:
+            return
+        # Не tryTake: пул удаляет Worker после run(), а сигнал о результате может еще идти в
+        # поток интерфейса — обращение к удаленному объекту уронит приложение. Отмененная
+        # задача из очереди сразу вернется, а результат уже выполненной будет отброшен
+        self._pending.cancel()
+        self._pending = None
+        self.loadingChanged.emit(False)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and role == Qt.ItemDataRole.DisplayRole:
+            return self._display[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    @staticmethod
+    def _format(row):
+        raise NotImplementedError
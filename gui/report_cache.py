@@ -0,0 +1,96 @@
+"""Дисковый кэш готовых отчетов.
+
+Ключ — охват пользователя, период, формат и водяной знак данных (report_watermark):
+пока в периоде ничего не менялось, отчет отдается копированием файла, а не строится
+заново. Устаревшие записи не удаляются явно — их ключ просто больше не запрашивается,
+и они вытесняются по LRU, когда кэш превышает SUPPORT_REPORT_CACHE_MB.
+
+Переименование техника не меняет водяной знак; такой отчет обновится после любого
+изменения заявок периода. SUPPORT_REPORT_CACHE_MB=0 отключает кэш.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from models import UserRole
+
+CACHE_VERSION = 1  # Увеличивается при изменении разметки отчетов — старые записи перестают совпадать
+CACHE_DIR = os.getenv("SUPPORT_REPORT_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "support_desk", "reports"
+)
+CACHE_MAX_BYTES = int(float(os.getenv("SUPPORT_REPORT_CACHE_MB", "200")) * 1024 * 1024)
+SUFFIX = ".report"
+
+
+def report_scope_key(user):
+    """Администраторы видят одни и те же данные и делят записи, техник — только свои"""
+    if user.role == UserRole.TECHNICIAN:
+        return f"technician:{user.id}"
+    return "all"
+
+
+class ReportCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(user, start_date, end_date, report_format, watermark):
+        rows, last_change = watermark
+        parts = [CACHE_VERSION, report_scope_key(user), start_date.isoformat(), end_date.isoformat(),
+                 report_format, rows, last_change.isoformat() if last_change else None]
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def fetch(self, key, file_path):
+        """Копирует отчет из кэша в file_path; False, если записи нет"""
+        if not self.enabled:
+            return False
+        path = self._path(key)
+        try:
+            os.utime(path)  # Время доступа для LRU — в mtime, atime часто не обновляется
+            shutil.copyfile(path, file_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key, file_path):
+        """Кладет готовый отчет в кэш и вытесняет самые давние записи сверх лимита"""
+        if not self.enabled or os.path.getsize(file_path) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Через временный файл и rename: параллельный fetch не увидит недописанную запись
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as target, open(file_path, "rb") as source:
+                shutil.copyfileobj(source, target)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Уже вытеснен другим процессом
+            total -= size
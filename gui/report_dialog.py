@@ -1,15 +1,18 @@
 # report_dialog.py
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-    QDateEdit, QComboBox, QPushButton, QFileDialog, QMessageBox
+    QDateEdit, QComboBox, QPushButton, QFileDialog, QMessageBox, QProgressBar
 )
-from PyQt6.QtCore import QDate
+from PyQt6.QtCore import QDate, QThreadPool
 
 
 class ReportDialog(QDialog):
-    def __init__(self, user):
-        super().__init__()
+    def __init__(self, user, parent=None):
+        super().__init__(parent)
         self.user = user
+        self.job = None
+        # Немодальный диалог: главное окно остается доступным во время генерации
+        self.setModal(False)
         self.initUI()
 
     def initUI(self):
@@ -33,13 +36,23 @@ class ReportDialog(QDialog):
         self.format_combo.addItems(["PDF", "Excel", "CSV"])
 
         # Кнопки
-        btn_generate = QPushButton("Сгенерировать")
-        btn_generate.clicked.connect(self.generate_report)
+        self.btn_generate = QPushButton("Сгенерировать")
+        self.btn_generate.clicked.connect(self.generate_report)
+        self.btn_cancel = QPushButton("Отменить")
+        self.btn_cancel.clicked.connect(self.cancel_report)
+        self.btn_cancel.setEnabled(False)
+
+        # Прогресс: записано строк / оценка общего числа
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setFormat("%v / %m")
+        self.progress_bar.hide()
 
         layout.addLayout(period_layout)
         layout.addWidget(QLabel("Формат:"))
         layout.addWidget(self.format_combo)
-        layout.addWidget(btn_generate)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.btn_generate)
+        layout.addWidget(self.btn_cancel)
 
         self.setLayout(layout)
 
@@ -63,45 +76,75 @@ class ReportDialog(QDialog):
         if not file_path:
             return
 
-        # Добавить эту часть для генерации отчета
+        from report_cache import ReportCache
         from report_generator import ReportGenerator
-        from database import get_db
-        from models import Ticket
-
-        try:
-            # Получаем даты
-            start_date = self.start_date.date().toPyDate()
-            end_date = self.end_date.date().toPyDate()
-
-            # Создаем генератор отчетов
-            generator = ReportGenerator(self.user, start_date, end_date)
-
-            # Получаем данные
-            tickets = generator.get_tickets()
-
-            if not tickets:
-                QMessageBox.warning(self, "Ошибка", "Нет данных для выбранного периода")
-                return
-
-            # Генерируем отчет
-            if self.format_combo.currentText() == "PDF":
-                generator.generate_pdf(tickets, file_path)
-            elif self.format_combo.currentText() == "Excel":
-                generator.generate_excel(tickets, file_path)
-            else:
-                generator.generate_csv(tickets, file_path)
-
-            # Уведомляем пользователя
-            QMessageBox.information(
-                self,
-                "Успех",
-                f"Отчет успешно сохранен:\n{file_path}"
-            )
-            self.accept()
-
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Ошибка",
-                f"Не удалось сгенерировать отчет:\n{str(e)}"
-            )
\ No newline at end of file
+        from report_job import ReportJob
+
+        # Получаем даты
+        start_date = self.start_date.date().toPyDate()
+        end_date = self.end_date.date().toPyDate()
+
+        # Создаем генератор отчетов и запускаем его в фоне
+        generator = ReportGenerator(self.user, start_date, end_date, cache=ReportCache())
+        self.job = ReportJob(generator, self.format_combo.currentText(), file_path)
+        self.job.signals.progress.connect(self.on_progress)
+        self.job.signals.finished.connect(self.on_finished)
+        self.job.signals.failed.connect(self.on_failed)
+        self.job.signals.cancelled.connect(self.on_cancelled)
+
+        self.set_running(True)
+        QThreadPool.globalInstance().start(self.job)
+
+    def cancel_report(self):
+        if self.job is not None:
+            self.btn_cancel.setEnabled(False)
+            self.job.cancel()
+
+    def set_running(self, running):
+        self.btn_generate.setEnabled(not running)
+        self.btn_cancel.setEnabled(running)
+        self.format_combo.setEnabled(not running)
+        self.start_date.setEnabled(not running)
+        self.end_date.setEnabled(not running)
+        self.progress_bar.setRange(0, 0)  # Пока неизвестен объем — "бегущий" индикатор
+        self.progress_bar.setVisible(running)
+
+    def on_progress(self, written, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(written)
+
+    def on_finished(self, file_path, written):
+        self.job = None
+        self.set_running(False)
+
+        if not written:
+            QMessageBox.warning(self, "Ошибка", "Нет данных для выбранного периода")
+            return
+
+        # Уведомляем пользователя
+        QMessageBox.information(
+            self,
+            "Успех",
+            f"Отчет успешно сохранен ({written} строк):\n{file_path}"
+        )
+        self.accept()
+
+    def on_failed(self, message):
+        self.job = None
+        self.set_running(False)
+        QMessageBox.critical(
+            self,
+            "Ошибка",
+            f"Не удалось сгенерировать отчет:\n{message}"
+        )
+
+    def on_cancelled(self):
+        self.job = None
+        self.set_running(False)
+        if self.isVisible():
+            QMessageBox.information(self, "Отмена", "Генерация отчета отменена")
+
+    def reject(self):
+        # Закрытие окна во время генерации отменяет задачу
+        self.cancel_report()
+        super().reject()
@@ -1,39 +1,122 @@
 # report_generator.py
-from datetime import datetime
 import csv
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4
-from openpyxl import Workbook
-from database import get_db
-from models import Ticket, TicketStatus, User, UserRole
+import os
+import uuid
+from database import session_scope
+from ticket_queries import report_rows_query, report_watermark
+from ticket_stats import report_summary
+
+
+STREAM_BATCH_SIZE = 1000
+PROGRESS_STEP = 500  # Как часто (в строках) сообщать о прогрессе
+
+
+class ReportCancelled(Exception):
+    """Генерация отчета прервана пользователем"""
 
 
 class ReportGenerator:
-    def __init__(self, user, start_date, end_date):
+    FORMATS = {
+        "PDF": "generate_pdf",
+        "Excel": "generate_excel",
+        "CSV": "generate_csv",
+    }
+
+    def __init__(self, user, start_date, end_date, cache=None):
         self.user = user
         self.start_date = start_date
         self.end_date = end_date
+        self.cache = cache  # ReportCache или None — строить всегда заново
+        self._db_connection = None
 
-    def generate_pdf(self, tickets, file_path):
-        c = canvas.Canvas(file_path, pagesize=A4)  # Используем переданный путь
-        c.setFont("Helvetica-Bold", 14)
-        c.drawString(50, 800, f"Отчет ({self.start_date} - {self.end_date})")
+    def generate(self, report_format, file_path, progress=None, cancelled=None):
+        """Потоково формирует отчет в file_path и возвращает число записанных строк.
 
-        y = 750
-        c.setFont("Helvetica", 10)
-        for ticket in tickets:
-            text = f"{ticket.id} | {ticket.title} | {ticket.status.value}"
-            c.drawString(50, y, text)
-            y -= 20
-            if y < 50:
-                c.showPage()
-                y = 800
-        c.save()
-
-    def generate_excel(self, tickets, file_path):
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Заявки"
+        progress(written, total) вызывается каждые PROGRESS_STEP строк, cancelled() проверяется
+        перед каждой строкой. Отчет пишется во временный файл рядом с file_path и заменяет его
+        только при успехе: при отмене или ошибке прежний файл пользователя остается нетронутым.
+        С кэшем отчет за период без изменений копируется из него, а не строится заново.
+        """
+        cache_key = None
+        if self.cache is not None and self.cache.enabled:
+            watermark = self.get_watermark()
+            total = watermark[0]
+            if total:
+                cache_key = self.cache.key(self.user, self.start_date, self.end_date, report_format, watermark)
+        else:
+            total = self.count_tickets()
+        if total == 0:
+            return 0
+        temp_path = self.temp_path(file_path)
+        if cache_key is not None and self.cache.fetch(cache_key, temp_path):
+            os.replace(temp_path, file_path)
+            if progress:
+                progress(total, total)
+            return total
+        if progress:
+            progress(0, total)
+
+        summary = self.get_summary()
+        written = 0
+        rows = self.iter_tickets()
+
+        def tracked_rows():
+            nonlocal written
+            for row in rows:
+                if cancelled is not None and cancelled():
+                    raise ReportCancelled()
+                yield row
+                written += 1
+                if progress and written % PROGRESS_STEP == 0:
+                    progress(written, max(total, written))
+
+        try:
+            getattr(self, self.FORMATS[report_format])(tracked_rows(), temp_path, summary)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            rows.close()  # Закрывает сессию и серверный курсор
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        if cache_key is not None:
+            self.cache.store(cache_key, file_path)
+        if progress:
+            progress(written, written)
+        return written
+
+    @staticmethod
+    def temp_path(file_path):
+        """Скрытый временный файл в том же каталоге (os.replace атомарен в пределах файловой
+        системы) и с тем же расширением — по нему форматы определяют тип файла"""
+        directory, name = os.path.split(os.path.abspath(file_path))
+        base, extension = os.path.splitext(name)
+        return os.path.join(directory, f".{base}.{uuid.uuid4().hex[:8]}.part{extension}")
+
+    def cancel_query(self):
+        """Прерывает выполняющийся запрос отчета (вызывается из другого потока)"""
+        connection = self._db_connection
+        cancel = getattr(connection, "cancel", None)  # psycopg2 умеет отменять запрос на сервере
+        if cancel is not None:
+            cancel()
+
+    def generate_pdf(self, tickets, file_path, summary=None):
+        # Таблица рисуется кусками в пуле процессов, см. report_pdf; reportlab грузится при первом PDF
+        from gui.report_pdf import table_row, write_pdf
+
+        write_pdf(
+            (table_row(ticket) for ticket in tickets),
+            file_path,
+            f"Отчет ({self.start_date} - {self.end_date})",
+            self.summary_sections(summary) if summary else (),
+        )
+
+    def generate_excel(self, tickets, file_path, summary=None):
+        from openpyxl import Workbook
+
+        # Write-only книга сбрасывает строки на диск, не держа все ячейки в памяти
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Заявки")
         ws.append(["ID", "Заголовок", "Статус", "Дата"])
 
         for ticket in tickets:
@@ -44,9 +127,17 @@ class ReportGenerator:
                 ticket.created_at.strftime('%d.%m.%Y')
             ])
 
+        if summary:
+            ws_summary = wb.create_sheet("Сводка")
+            for title, items in self.summary_sections(summary):
+                ws_summary.append([title])
+                for label, value in items:
+                    ws_summary.append([label, value])
+                ws_summary.append([])
+
         wb.save(file_path)  # Сохраняем по переданному пути
 
-    def generate_csv(self, tickets, file_path):
+    def generate_csv(self, tickets, file_path, summary=None):
         with open(file_path, 'w', newline='', encoding='utf-8') as f:  # Используем file_path
             writer = csv.writer(f, delimiter=';')
             writer.writerow(["ID", "Заголовок", "Статус", "Дата"])
@@ -58,14 +149,57 @@ class ReportGenerator:
                     ticket.created_at.strftime('%d.%m.%Y')
                 ])
 
+            if summary:
+                for title, items in self.summary_sections(summary):
+                    writer.writerow([])
+                    writer.writerow([title])
+                    writer.writerows(items)
+
+    @staticmethod
+    def summary_sections(summary):
+        """Сводка в виде разделов (заголовок, [(показатель, значение)]) для любого формата"""
+        def hours(value):
+            return f"{value:.1f} ч" if value is not None else "—"
+
+        return [
+            ("По статусам", summary["by_status"]),
+            ("По приоритетам", summary["by_priority"]),
+            ("По техникам", summary["by_technician"]),
+            ("Закрытие", [
+                ("Создано за период", summary["opened"]),
+                ("Закрыто за период", summary["closed"]),
+                ("Среднее время закрытия", hours(summary["avg_close_hours"])),
+                ("Медианное время закрытия", hours(summary["median_close_hours"])),
+                ("Открыто на конец периода", summary["open_backlog"]),
+            ]),
+        ]
+
+    def get_summary(self):
+        with session_scope() as db:
+            return report_summary(db, self.user, self.start_date, self.end_date)
+
+    def get_watermark(self):
+        with session_scope() as db:
+            return report_watermark(db, self.user, self.start_date, self.end_date)
+
     def get_tickets(self):
-        db = next(get_db())
-        query = db.query(Ticket).filter(
-            Ticket.created_at >= self.start_date,
-            Ticket.created_at <= self.end_date
-        )
+        with session_scope() as db:
+            return report_rows_query(db, self.user, self.start_date, self.end_date).all()
+
+    def count_tickets(self):
+        """Число строк отчета — оценка для индикатора прогресса"""
+        with session_scope() as db:
+            return report_rows_query(db, self.user, self.start_date, self.end_date).order_by(None).count()
 
-        if self.user.role == UserRole.TECHNICIAN:
-            query = query.filter(Ticket.technician_id == self.user.id)
+    def iter_tickets(self, batch_size=STREAM_BATCH_SIZE):
+        """Потоково отдает строки отчета через серверный курсор, batch_size строк за раз.
 
-        return query.all()
\ No newline at end of file
+        Все generate_* принимают такой итератор, поэтому память не растет с размером периода.
+        """
+        with session_scope() as db:
+            self._db_connection = db.connection().connection
+            try:
+                query = report_rows_query(db, self.user, self.start_date, self.end_date)
+                yield from query.yield_per(batch_size)
+            finally:
+                self._db_connection = None
\ No newline at end of file
@@ -0,0 +1,55 @@
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from database import sql_action
+from report_generator import ReportCancelled
+
+
+class ReportJobSignals(QObject):
+    progress = pyqtSignal(int, int)  # Записано строк, оценка общего числа
+    finished = pyqtSignal(str, int)  # Путь к файлу, число строк
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class ReportJob(QRunnable):
+    """Фоновая генерация отчета с прогрессом и отменой"""
+
+    def __init__(self, generator, report_format, file_path):
+        super().__init__()
+        self.generator = generator
+        self.report_format = report_format
+        self.file_path = file_path
+        self.signals = ReportJobSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+        self.generator.cancel_query()
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        try:
+            with sql_action("generate_report"):
+                written = self.generator.generate(
+                    self.report_format,
+                    self.file_path,
+                    progress=self.signals.progress.emit,
+                    cancelled=self.is_cancelled
+                )
+        except ReportCancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as e:
+            # Отмена запроса на сервере приходит как ошибка драйвера
+            if self._cancelled:
+                self.signals.cancelled.emit()
+                return
+            traceback.print_exc()
+            self.signals.failed.emit(str(e))
+            return
+
+        self.signals.finished.emit(self.file_path, written)
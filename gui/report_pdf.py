@@ -0,0 +1,276 @@
+"""PDF-отчет в виде таблицы, рисуемый частями в нескольких процессах.
+
+Разбивка на страницы считается заранее: на каждой странице ровно ROWS_PER_PAGE строк
+(длинный текст обрезается по ширине колонки), поэтому номер страницы любой строки известен
+до отрисовки. Строки собираются в куски по CHUNK_PAGES страниц, каждый кусок рисуется
+в пуле процессов в отдельный PDF, затем куски склеиваются через pypdf. Без pypdf, при одном
+процессе или если отчет умещается в один кусок, все рисуется последовательно в этом процессе
+с той же разметкой.
+
+Шрифт с кириллицей ищется один раз на процесс (в том числе в инициализаторе пула):
+SUPPORT_PDF_FONT / SUPPORT_PDF_FONT_BOLD, затем DejaVu Sans, Arial, Liberation Sans.
+"""
+import logging
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # Без pypdf куски не склеить — отчет рисуется последовательно
+    PdfWriter = None
+
+logger = logging.getLogger("support.reports")
+
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 36
+FONT_SIZE = 8
+ROW_HEIGHT = 14
+TABLE_TOP = PAGE_HEIGHT - MARGIN - 24  # Над таблицей — заголовок отчета
+TABLE_BOTTOM = MARGIN + 16  # Под таблицей — номер страницы
+ROWS_PER_PAGE = int((TABLE_TOP - TABLE_BOTTOM) // ROW_HEIGHT) - 1  # Минус строка заголовков
+CHUNK_PAGES = 40
+PDF_WORKERS = int(os.getenv("SUPPORT_PDF_WORKERS", "0")) or os.cpu_count() or 1
+
+# (заголовок, ширина); сумма ширин — ширина страницы без полей
+COLUMNS = (
+    ("ID", 45),
+    ("Заголовок", 190),
+    ("Статус", 70),
+    ("Приоритет", 58),
+    ("Техник", 100),
+    ("Создана", 60),
+)
+CELL_PADDING = 3
+
+FONT_DIRS = (
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF",
+    "/usr/share/fonts/truetype/liberation",
+    "/usr/share/fonts/liberation",
+    os.path.join(os.getenv("WINDIR", "C:/Windows"), "Fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts/Supplemental",
+)
+# (обычный, жирный) — в порядке предпочтения
+FONT_FILES = (
+    ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf"),
+    ("arial.ttf", "arialbd.ttf"),
+    ("Arial.ttf", "Arial Bold.ttf"),
+    ("LiberationSans-Regular.ttf", "LiberationSans-Bold.ttf"),
+)
+
+_fonts = None
+
+
+def find_font_files():
+    """Пути (обычный, жирный) к TTF с кириллицей или None; жирный может совпадать с обычным"""
+    regular = os.getenv("SUPPORT_PDF_FONT")
+    if regular:
+        return regular, os.getenv("SUPPORT_PDF_FONT_BOLD") or regular
+    for regular_name, bold_name in FONT_FILES:
+        for directory in FONT_DIRS:
+            regular = os.path.join(directory, regular_name)
+            if os.path.isfile(regular):
+                bold = os.path.join(directory, bold_name)
+                return regular, bold if os.path.isfile(bold) else regular
+    return None
+
+
+def register_fonts():
+    """Регистрирует шрифт один раз на процесс и возвращает имена (обычный, жирный)"""
+    global _fonts
+    if _fonts is not None:
+        return _fonts
+
+    files = find_font_files()
+    if files is None:
+        logger.warning("Шрифт с кириллицей не найден, русский текст в PDF не отобразится; "
+                       "укажите путь к TTF в SUPPORT_PDF_FONT")
+        _fonts = ("Helvetica", "Helvetica-Bold")
+        return _fonts
+
+    regular, bold = files
+    pdfmetrics.registerFont(TTFont("ReportSans", regular))
+    pdfmetrics.registerFont(TTFont("ReportSans-Bold", bold))
+    _fonts = ("ReportSans", "ReportSans-Bold")
+    return _fonts
+
+
+def table_row(ticket):
+    """Строка отчета как кортеж строк — легко передается в другой процесс"""
+    return (
+        str(ticket.id),
+        ticket.title or "",
+        ticket.status.value,
+        ticket.priority or "",
+        ticket.technician_name or "—",
+        ticket.created_at.strftime('%d.%m.%Y'),
+    )
+
+
+def fit(text, font, width):
+    """Обрезает текст с многоточием, чтобы он уместился в ширину колонки"""
+    if pdfmetrics.stringWidth(text, font, FONT_SIZE) <= width:
+        return text
+    while text and pdfmetrics.stringWidth(text + "…", font, FONT_SIZE) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+def draw_page_frame(c, title, page_number):
+    regular, bold = register_fonts()
+    c.setFont(bold, 12)
+    c.drawString(MARGIN, PAGE_HEIGHT - MARGIN - 12, title)
+    c.setFont(regular, FONT_SIZE)
+    c.drawRightString(PAGE_WIDTH - MARGIN, MARGIN, f"Стр. {page_number}")
+
+
+def draw_table_page(c, title, page_number, rows):
+    """Одна страница таблицы: заголовок отчета, шапка, строки и сетка"""
+    regular, bold = register_fonts()
+    draw_page_frame(c, title, page_number)
+
+    y = TABLE_TOP
+    c.setFillGray(0.9)
+    c.rect(MARGIN, y - ROW_HEIGHT, PAGE_WIDTH - 2 * MARGIN, ROW_HEIGHT, stroke=0, fill=1)
+    c.setFillGray(0)
+    for line in [None] + rows:
+        font = bold if line is None else regular
+        c.setFont(font, FONT_SIZE)
+        x = MARGIN
+        for column, (header, width) in enumerate(COLUMNS):
+            text = header if line is None else line[column]
+            c.drawString(x + CELL_PADDING, y - ROW_HEIGHT + 4, fit(text, font, width - 2 * CELL_PADDING))
+            x += width
+        y -= ROW_HEIGHT
+
+    c.setLineWidth(0.3)
+    for line_y in range(len(rows) + 2):
+        c.line(MARGIN, TABLE_TOP - line_y * ROW_HEIGHT, PAGE_WIDTH - MARGIN, TABLE_TOP - line_y * ROW_HEIGHT)
+    x = MARGIN
+    for _, width in COLUMNS + (("", 0),):
+        c.line(x, TABLE_TOP, x, y)
+        x += width
+    c.showPage()
+
+
+def draw_rows(c, title, first_page, rows):
+    """Рисует строки постранично начиная с first_page; возвращает номер следующей страницы"""
+    page_number = first_page
+    for start in range(0, len(rows), ROWS_PER_PAGE):
+        draw_table_page(c, title, page_number, rows[start:start + ROWS_PER_PAGE])
+        page_number += 1
+    return page_number
+
+
+def draw_summary(c, title, first_page, sections):
+    """Сводка — с новой страницы после таблицы"""
+    regular, bold = register_fonts()
+    page_number = first_page
+    draw_page_frame(c, title, page_number)
+    y = TABLE_TOP
+    for section_title, items in sections:
+        c.setFont(bold, 11)
+        c.drawString(MARGIN, y, section_title)
+        y -= 18
+        c.setFont(regular, 10)
+        for label, value in items:
+            c.drawString(MARGIN + 20, y, f"{label}: {value}")
+            y -= 15
+            if y < TABLE_BOTTOM:
+                c.showPage()
+                page_number += 1
+                draw_page_frame(c, title, page_number)
+                c.setFont(regular, 10)
+                y = TABLE_TOP
+        y -= 10
+    c.showPage()
+
+
+def render_chunk(file_path, title, first_page, rows):
+    """Задача пула: рисует кусок таблицы в отдельный PDF"""
+    c = canvas.Canvas(file_path, pagesize=A4)
+    draw_rows(c, title, first_page, rows)
+    c.save()
+    return file_path
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def write_pdf(rows, file_path, title, summary_sections=(), workers=None):
+    """Пишет таблицу строк (кортежи из table_row) и сводку в file_path.
+
+    rows читается потоково; в памяти одновременно не больше 2 * workers кусков.
+    """
+    workers = workers or PDF_WORKERS
+    chunks = chunked(rows, ROWS_PER_PAGE * CHUNK_PAGES)
+    first = next(chunks, [])
+    second = next(chunks, None)
+    if second is None:
+        write_serial([first], file_path, title, summary_sections)
+        return
+    chunks = chain([first, second], chunks)
+    if PdfWriter is None or workers < 2:
+        write_serial(chunks, file_path, title, summary_sections)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="report_pdf_") as temp_dir:
+        # spawn: отчет строится в потоке QThreadPool, а fork многопоточного процесса может зависнуть
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=register_fonts, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            parts = []
+            pending = deque()
+            page_number = 1
+            for index, chunk in enumerate(chunks):
+                # Ждем самый старый кусок, чтобы не читать строки быстрее, чем они рисуются
+                if len(pending) >= 2 * workers:
+                    pending.popleft().result()
+                path = os.path.join(temp_dir, f"part{index:05d}.pdf")
+                pending.append(pool.submit(render_chunk, path, title, page_number, chunk))
+                parts.append(path)
+                page_number += -(-len(chunk) // ROWS_PER_PAGE)
+            for future in pending:
+                future.result()
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+        if summary_sections:
+            path = os.path.join(temp_dir, "summary.pdf")
+            c = canvas.Canvas(path, pagesize=A4)
+            draw_summary(c, title, page_number, summary_sections)
+            c.save()
+            parts.append(path)
+
+        writer = PdfWriter()
+        for path in parts:
+            writer.append(path)
+        with open(file_path, "wb") as f:
+            writer.write(f)
+
+
+def write_serial(chunks, file_path, title, summary_sections=()):
+    c = canvas.Canvas(file_path, pagesize=A4)
+    page_number = 1
+    for chunk in chunks:
+        page_number = draw_rows(c, title, page_number, chunk)
+    if summary_sections:
+        draw_summary(c, title, page_number, summary_sections)
+    c.save()
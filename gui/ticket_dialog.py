@@ -2,8 +2,12 @@ from PyQt6.QtWidgets import (
     QDialog, QLabel, QLineEdit, QTextEdit, QComboBox,
     QPushButton, QVBoxLayout, QHBoxLayout, QMessageBox
 )
-from database import get_db
+from sqlalchemy.orm import undefer
+from sqlalchemy.orm.exc import StaleDataError
+
+from database import session_scope, sql_action
 from models import Ticket, TicketStatus, UserRole
+from ticket_history import record_changes
 
 
 class TicketDialog(QDialog):
@@ -67,52 +71,57 @@ class TicketDialog(QDialog):
         self.priority_combo.setCurrentText(self.ticket.priority or "medium")
 
     def save_ticket(self):
-        db = next(get_db())
         try:
-            if not self.ticket:  # Создание новой заявки
-                new_ticket = Ticket(
-                    title=self.title_input.text(),
-                    description=self.description_input.toPlainText(),
-                    status=TicketStatus(self.status_combo.currentText()),
-                    priority=self.priority_combo.currentText(),
-                    client_id=self.user.id
-                )
-                db.add(new_ticket)
-                db.commit()
-                self.accept()
-                return
-
-            # Для существующей заявки:
-            # 1. Получаем свежую версию из БД
-            db_ticket = db.query(Ticket).get(self.ticket.id)
-            if not db_ticket:
-                raise ValueError("Заявка не найдена в базе данных")
-
-            # 2. Фиксируем изменения
-            old_status = db_ticket.status
-
-            db_ticket.title = self.title_input.text()
-            db_ticket.description = self.description_input.toPlainText()
-            db_ticket.status = TicketStatus(self.status_combo.currentText())
-            db_ticket.priority = self.priority_combo.currentText()
-
-            # 3. Автоназначение техника
-            if (self.user.role == UserRole.TECHNICIAN and
-                    db_ticket.status == TicketStatus.IN_PROGRESS and
-                    not db_ticket.technician_id):
-                db_ticket.technician_id = self.user.id
-
-            db.commit()
+            with sql_action("save_ticket"), session_scope() as db:
+                if not self.ticket:  # Создание новой заявки
+                    new_ticket = Ticket(
+                        title=self.title_input.text(),
+                        description=self.description_input.toPlainText(),
+                        status=TicketStatus(self.status_combo.currentText()),
+                        priority=self.priority_combo.currentText(),
+                        client_id=self.user.id
+                    )
+                    db.add(new_ticket)
+                else:
+                    self.update_ticket(db)
             self.accept()
 
+        except StaleDataError:
+            QMessageBox.warning(
+                self, "Конфликт",
+                "Заявку уже изменил другой пользователь. Откройте ее заново и повторите правку."
+            )
         except Exception as e:
-            db.rollback()
             QMessageBox.critical(self, "Ошибка", f"Ошибка сохранения: {str(e)}")
             import traceback
             traceback.print_exc()
-        finally:
-            db.close()
 
+    def update_ticket(self, db):
+        # Для существующей заявки:
+        # 1. Получаем свежую версию из БД (с описанием — журналу нужно старое значение)
+        db_ticket = db.query(Ticket).options(undefer(Ticket.description)).get(self.ticket.id)
+        if not db_ticket:
+            raise ValueError("Заявка не найдена в базе данных")
+        # Версия, которую видел пользователь; UPDATE дополнительно проверит ее в WHERE
+        if self.ticket.version is not None and db_ticket.version != self.ticket.version:
+            raise StaleDataError("Заявка изменена после открытия диалога")
+
+        # 2. Фиксируем изменения
+        old_status = db_ticket.status
+
+        db_ticket.title = self.title_input.text()
+        db_ticket.description = self.description_input.toPlainText()
+        db_ticket.status = TicketStatus(self.status_combo.currentText())
+        db_ticket.priority = self.priority_combo.currentText()
+
+        # 3. Автоназначение техника
+        if (self.user.role == UserRole.TECHNICIAN and
+                db_ticket.status == TicketStatus.IN_PROGRESS and
+                not db_ticket.technician_id):
+            db_ticket.technician_id = self.user.id
+
+        # 4. Журнал: только реально измененные поля, одной вставкой в той же транзакции
+        record_changes(db, db_ticket, self.user.id)
 
     def send_status_notification(self, old_status):
         """Отправляет уведомление об изменении статуса (заглушка)"""
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+
+from PyQt6.QtCore import QObject, QThreadPool, QTimer, pyqtSignal, pyqtSlot
+
+from database import get_engine, session_scope
+from gui.workers import Worker
+from ticket_notify import TicketChangeListener
+from ticket_queries import latest_change, fetch_ticket_changes
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class TicketSync(QObject):
+    """Догружает изменения заявок после водяного знака updated_at.
+
+    Запуск синхронизации — по LISTEN/NOTIFY из PostgreSQL, а если он недоступен — опросом по таймеру.
+    """
+
+    changesReady = pyqtSignal(list)
+    resyncNeeded = pyqtSignal()  # Изменений слишком много — дешевле перезагрузить список
+    _notified = pyqtSignal()
+
+    POLL_INTERVAL_MS = 15000
+    SAFETY_POLL_INTERVAL_MS = 60000  # Страховочный опрос при работающем LISTEN
+    NOTIFY_DEBOUNCE_MS = 500
+    # Транзакция может зафиксироваться позже, чем выставлен ее now(); перекрытие ловит такие строки
+    OVERLAP = timedelta(seconds=5)
+    MAX_CHANGES = 1000
+
+    def __init__(self, user, parent=None):
+        super().__init__(parent)
+        self.user = user
+        self.watermark = None
+        self._pending = None
+        self._again = False
+
+        self.notify_timer = QTimer(self)
+        self.notify_timer.setSingleShot(True)
+        self.notify_timer.setInterval(self.NOTIFY_DEBOUNCE_MS)
+        self.notify_timer.timeout.connect(self.sync_now)
+        self._notified.connect(self.notify_timer.start)
+
+        # Пока LISTEN не подключен — обычный опрос; подключение к БД идет в фоне, а не в потоке окна
+        self.listener = None
+        self._stopped = False
+        self.poll_timer = QTimer(self)
+        self.poll_timer.timeout.connect(self.poll)
+        self.poll_timer.start(self.POLL_INTERVAL_MS)
+        self._listener_worker = Worker(self._start_listener)
+        self._listener_worker.signals.finished.connect(self._on_listener_started)
+        QThreadPool.globalInstance().start(self._listener_worker)
+
+    def restart(self):
+        """Сбрасывает водяной знак после полной перезагрузки списка"""
+        self._drop_pending()
+        self.watermark = None
+        self._start(self._fetch_watermark, self._on_watermark)
+
+    def poll(self):
+        if self.listener is not None and not self.listener.is_alive():
+            self.poll_timer.setInterval(self.POLL_INTERVAL_MS)
+        self.sync_now()
+
+    def sync_now(self):
+        if self._pending is not None:
+            self._again = True  # Уведомление пришло во время синхронизации — повторим после нее
+            return
+        if self.watermark is None:
+            return
+        self._start(self._fetch_changes, self._on_changes, self.watermark)
+
+    def stop(self):
+        self._stopped = True
+        self.poll_timer.stop()
+        self.notify_timer.stop()
+        self._drop_pending()
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def _start_listener(self):
+        listener = TicketChangeListener(get_engine(), self._notified.emit)
+        return listener if listener.start() else None
+
+    @pyqtSlot(object, object)
+    def _on_listener_started(self, worker, listener):
+        self._listener_worker = None
+        if listener is None:
+            return  # Не PostgreSQL или LISTEN недоступен — остаемся на опросе
+        if self._stopped:
+            listener.stop()  # Окно закрыли, пока слушатель подключался
+            return
+        self.listener = listener
+        self.poll_timer.setInterval(self.SAFETY_POLL_INTERVAL_MS)
+
+    def _start(self, fn, on_finished, *args):
+        self._pending = Worker(fn, *args)
+        self._pending.signals.finished.connect(on_finished)
+        self._pending.signals.failed.connect(self._on_failed)
+        QThreadPool.globalInstance().start(self._pending)
+
+    def _drop_pending(self):
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        self._again = False
+
+    def _fetch_watermark(self):
+        with session_scope() as db:
+            return latest_change(db, self.user) or EPOCH
+
+    def _fetch_changes(self, since):
+        with session_scope() as db:
+            if since is not EPOCH:
+                since -= self.OVERLAP
+            return fetch_ticket_changes(db, self.user, since, self.MAX_CHANGES)
+
+    @pyqtSlot(object, object)
+    def _on_watermark(self, worker, watermark):
+        if worker is not self._pending:
+            return
+        self._pending = None
+        self.watermark = watermark
+        self._repeat_if_requested()
+
+    @pyqtSlot(object, object)
+    def _on_changes(self, worker, rows):
+        if worker is not self._pending:
+            return
+        self._pending = None
+
+        if len(rows) >= self.MAX_CHANGES:
+            self.resyncNeeded.emit()
+            return
+        if rows:
+            latest = rows[-1].updated_at  # Строки упорядочены по updated_at
+            self.watermark = latest if self.watermark is EPOCH else max(self.watermark, latest)
+            self.changesReady.emit(rows)
+        self._repeat_if_requested()
+
+    @pyqtSlot(object, str)
+    def _on_failed(self, worker, message):
+        if worker is self._pending:
+            self._pending = None  # Следующий опрос попробует снова
+
+    def _repeat_if_requested(self):
+        if self._again:
+            self._again = False
+            self.sync_now()
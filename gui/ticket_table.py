@@ -0,0 +1,152 @@
+from PyQt6.QtCore import Qt, QModelIndex
+from PyQt6.QtGui import QColor, QBrush, QTextDocument
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QApplication
+
+from models import TicketStatus
+from gui.paged_table import PagedTableModel
+from ticket_search import highlight_html
+
+# Дополнительные роли: делегат раскрашивает ячейки по ним, не создавая кистей на каждую строку
+STATUS_ROLE = Qt.ItemDataRole.UserRole + 1
+OWN_TICKET_ROLE = Qt.ItemDataRole.UserRole + 2
+HIGHLIGHT_ROLE = Qt.ItemDataRole.UserRole + 3  # HTML заголовка с подсветкой найденных слов
+
+TITLE_COLUMN = 1
+STATUS_COLUMN = 2
+TECHNICIAN_COLUMN = 5
+
+
+class TicketTableModel(PagedTableModel):
+    """Модель заявок, подгружающая строки страницами в фоновом потоке по мере прокрутки"""
+
+    HEADERS = ['ID', 'Заголовок', 'Статус', 'Приоритет', 'Дата создания', 'Техник']
+
+    def __init__(self, user_id, fetch_page=None, page_size=PagedTableModel.PAGE_SIZE):
+        super().__init__(fetch_page, page_size)
+        self.user_id = user_id
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display[index.row()][index.column()]
+        if role == STATUS_ROLE:
+            return self._rows[index.row()].status
+        if role == OWN_TICKET_ROLE:
+            return self._rows[index.row()].technician_id == self.user_id
+        if role == HIGHLIGHT_ROLE and index.column() == TITLE_COLUMN:
+            return highlight_html(getattr(self._rows[index.row()], "title_headline", None))
+        if role == Qt.ItemDataRole.ToolTipRole and index.column() == TITLE_COLUMN:
+            return highlight_html(getattr(self._rows[index.row()], "description_snippet", None))
+        return None
+
+    def apply_changes(self, rows, matches):
+        """Точечно применяет изменившиеся заявки к загруженным строкам.
+
+        matches(row) — попадает ли заявка под текущие фильтры. Строки вне уже загруженного
+        диапазона пропускаются: они придут со следующей страницей.
+        """
+        for row in rows:
+            position = self._position(row.id)
+            if position is not None:
+                if matches(row):
+                    self._rows[position] = row
+                    self._display[position] = self._format(row)
+                    self.dataChanged.emit(
+                        self.index(position, 0), self.index(position, self.columnCount() - 1)
+                    )
+                else:
+                    self.beginRemoveRows(QModelIndex(), position, position)
+                    del self._rows[position]
+                    del self._display[position]
+                    self.endRemoveRows()
+            elif matches(row) and self._within_loaded(row):
+                position = self._insert_position(row)
+                self.beginInsertRows(QModelIndex(), position, position)
+                self._rows.insert(position, row)
+                self._display.insert(position, self._format(row))
+                self.endInsertRows()
+
+    def _position(self, ticket_id):
+        for position, row in enumerate(self._rows):
+            if row.id == ticket_id:
+                return position
+        return None
+
+    @staticmethod
+    def _sort_key(row):
+        return row.created_at, row.id
+
+    def _within_loaded(self, row):
+        if self._exhausted:
+            return True
+        return bool(self._rows) and self._sort_key(row) > self._sort_key(self._rows[-1])
+
+    def _insert_position(self, row):
+        # Строки упорядочены от новых к старым, новые заявки почти всегда встают в начало
+        key = self._sort_key(row)
+        for position, existing in enumerate(self._rows):
+            if self._sort_key(existing) < key:
+                return position
+        return len(self._rows)
+
+    def ticket_id(self, row):
+        return self._rows[row].id
+
+    @staticmethod
+    def _format(row):
+        created_at = row.created_at.strftime("%d.%m.%Y %H:%M") if row.created_at else ""
+        return (
+            str(row.id),
+            row.title,
+            row.status.value,
+            row.priority or "",
+            created_at,
+            row.technician_name or "Не назначен",
+        )
+
+
+class TicketItemDelegate(QStyledItemDelegate):
+    """Подсвечивает статус и "свои" заявки техника"""
+
+    STATUS_BRUSHES = {
+        TicketStatus.OPEN: QBrush(QColor(255, 230, 230)),  # Красный
+        TicketStatus.IN_PROGRESS: QBrush(QColor(255, 255, 200)),  # Желтый
+        TicketStatus.CLOSED: QBrush(QColor(230, 255, 230)),  # Зеленый
+    }
+    OWN_TICKET_BRUSH = QBrush(QColor(220, 240, 255))  # Голубой
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+
+        brush = None
+        if index.column() == STATUS_COLUMN:
+            brush = self.STATUS_BRUSHES.get(index.data(STATUS_ROLE))
+        elif index.column() == TECHNICIAN_COLUMN and index.data(OWN_TICKET_ROLE):
+            brush = self.OWN_TICKET_BRUSH
+
+        if brush is not None:
+            option.backgroundBrush = brush
+
+    def paint(self, painter, option, index):
+        highlighted = index.data(HIGHLIGHT_ROLE)
+        if not highlighted:
+            super().paint(painter, option, index)
+            return
+
+        # Результат поиска: рисуем фон ячейки штатно, а текст — как HTML с подсветкой
+        self.initStyleOption(option, index)
+        option.text = ""
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+
+        document = QTextDocument()
+        document.setDefaultFont(option.font)
+        document.setHtml(highlighted)
+        text_rect = style.subElementRect(QStyle.SubElement.SE_ItemViewItemText, option, option.widget)
+        painter.save()
+        painter.translate(text_rect.topLeft())
+        painter.setClipRect(text_rect.translated(-text_rect.topLeft()))
+        document.drawContents(painter)
+        painter.restore()
@@ -1,43 +1,61 @@
+from functools import partial
+
 from PyQt6.QtWidgets import (
     QDialog, QTableView, QVBoxLayout, QPushButton,
     QMessageBox, QHeaderView, QInputDialog, QLineEdit,
-    QFormLayout, QComboBox, QDialogButtonBox
+    QFormLayout, QComboBox, QDialogButtonBox, QFileDialog, QHBoxLayout
 )
-from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtCore import Qt, QThreadPool, QTimer
 from PyQt6.QtGui import QStandardItemModel, QStandardItem
 from sqlalchemy.exc import IntegrityError
-from database import get_db
+from database import session_scope
 from models import User, UserRole
-import bcrypt
-
-
-class UserTableModel(QAbstractTableModel):
-    def __init__(self, data, headers):
-        super().__init__()
-        self._data = data
-        self._headers = headers
-
-    def rowCount(self, parent=QModelIndex()):
-        return len(self._data)
-
-    def columnCount(self, parent=QModelIndex()):
-        return len(self._headers)
-
-    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
-        if role == Qt.ItemDataRole.DisplayRole:
-            user = self._data[index.row()]
-            return [
-                user.id,
-                user.username,
-                user.full_name,
-                user.role.value
-            ][index.column()]
-        return None
-
-    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
-        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
-            return self._headers[section]
-        return None
+from auth import hash_password
+from user_import import import_users
+from user_queries import fetch_user_page
+
+from gui.paged_table import PagedTableModel
+from gui.workers import Worker
+
+
+class UserTableModel(PagedTableModel):
+    """Постраничная модель пользователей; сортировка по заголовку выполняется в БД.
+
+    fetch_users(sort_column, descending, after, limit) возвращает страницу строк
+    (id, username, full_name, role) с уже примененными фильтрами.
+    """
+
+    HEADERS = ["ID", "Логин", "Полное имя", "Роль"]
+
+    def __init__(self, page_size=PagedTableModel.PAGE_SIZE):
+        super().__init__(None, page_size)
+        self._fetch_users = None
+        self.sort_column = 0
+        self.descending = False
+
+    def set_query(self, fetch_users):
+        """Перезапрашивает первую страницу с новыми фильтрами, сохраняя сортировку"""
+        self._fetch_users = fetch_users
+        self.reset(partial(fetch_users, self.sort_column, self.descending))
+        self.fetchMore()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        if self._fetch_users is not None:
+            self.set_query(self._fetch_users)
+
+    def user_id(self, row):
+        return self._rows[row].id
+
+    @staticmethod
+    def _format(row):
+        return (
+            str(row.id),
+            row.username,
+            row.full_name or "",
+            row.role.value if row.role else "",
+        )
 
 
 class UserEditDialog(QDialog):
@@ -75,9 +93,12 @@ class UserEditDialog(QDialog):
 
 
 class UserManagementDialog(QDialog):
+    FILTER_DEBOUNCE_MS = 300
+
     def __init__(self, current_user):
         super().__init__()
         self.current_user = current_user
+        self.import_worker = None
         self.initUI()
         self.load_users()
 
@@ -87,9 +108,34 @@ class UserManagementDialog(QDialog):
 
         layout = QVBoxLayout()
 
+        # Фильтр по логину/имени и роли; ввод схлопывается в один запрос
+        filter_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Логин или полное имя…")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.schedule_reload)
+        self.role_filter = QComboBox()
+        self.role_filter.addItem("Все роли", None)
+        for role in UserRole:
+            self.role_filter.addItem(role.value, role.value)
+        self.role_filter.currentIndexChanged.connect(self.load_users)
+        filter_layout.addWidget(self.search_input)
+        filter_layout.addWidget(self.role_filter)
+
+        self.reload_timer = QTimer(self)
+        self.reload_timer.setSingleShot(True)
+        self.reload_timer.setInterval(self.FILTER_DEBOUNCE_MS)
+        self.reload_timer.timeout.connect(self.load_users)
+
+        # Пользователи подгружаются страницами, сортировка по щелчку на заголовке — в БД
+        self.user_model = UserTableModel()
+        self.user_model.loadFailed.connect(self.on_users_load_failed)
         self.table = QTableView()
+        self.table.setModel(self.user_model)
         self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)
+        self.table.setSortingEnabled(True)
 
         self.add_btn = QPushButton("Добавить")
         self.add_btn.clicked.connect(self.add_user)
@@ -97,8 +143,13 @@ class UserManagementDialog(QDialog):
         self.delete_btn = QPushButton("Удалить")
         self.delete_btn.clicked.connect(self.delete_user)
 
+        self.import_btn = QPushButton("Импорт из CSV")
+        self.import_btn.clicked.connect(self.import_csv)
+
+        layout.addLayout(filter_layout)
         layout.addWidget(self.table)
         layout.addWidget(self.add_btn)
+        layout.addWidget(self.import_btn)
         layout.addWidget(self.delete_btn)
 
         self.setLayout(layout)
@@ -122,17 +173,16 @@ class UserManagementDialog(QDialog):
             QMessageBox.warning(self, "Ошибка", "Выберите пользователя")
             return
 
-        user_id = self.table.model()._data[selected[0].row()].id
+        user_id = self.user_model.user_id(selected[0].row())
 
         if user_id == self.current_user.id:
             QMessageBox.warning(self, "Ошибка", "Нельзя изменить свою роль")
             return
 
-        db = next(get_db())
         try:
-            user = db.query(User).get(user_id)
-            user.role = new_role
-            db.commit()
+            with session_scope() as db:
+                user = db.query(User).get(user_id)
+                user.role = new_role
 
             role_name = {
                 UserRole.ADMIN: "администратор",
@@ -148,16 +198,23 @@ class UserManagementDialog(QDialog):
             self.load_users()
 
         except Exception as e:
-            db.rollback()
             QMessageBox.critical(self, "Ошибка", f"Ошибка: {str(e)}")
 
+    def schedule_reload(self):
+        self.reload_timer.start()
+
     def load_users(self):
-        db = next(get_db())
-        users = db.query(User).order_by(User.id).all()
+        self.reload_timer.stop()
+        search = self.search_input.text().strip()
+        role = UserRole(self.role_filter.currentData()) if self.role_filter.currentData() else None
+        self.user_model.set_query(partial(self.fetch_users_page, search, role))
+
+    def fetch_users_page(self, search, role, sort_column, descending, after, limit):
+        with session_scope() as db:
+            return fetch_user_page(db, search, role, sort_column, descending, after, limit)
 
-        model = UserTableModel(users, ["ID", "Логин", "Полное имя", "Роль"])
-        self.table.setModel(model)
-        self.table.resizeColumnsToContents()
+    def on_users_load_failed(self, message):
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить пользователей: {message}")
 
     def add_user(self):
         dialog = UserEditDialog()
@@ -172,13 +229,13 @@ class UserManagementDialog(QDialog):
                     QMessageBox.warning(self, "Ошибка", "Все поля обязательны для заполнения")
                     return
 
-                db = next(get_db())
-
-                if db.query(User).filter(User.username == username).first():
+                with session_scope() as db:
+                    exists = db.query(User).filter(User.username == username).first() is not None
+                if exists:
                     QMessageBox.warning(self, "Ошибка", "Пользователь с таким логином уже существует")
                     return
 
-                hashed_pw = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+                hashed_pw = hash_password(password)
 
                 new_user = User(
                     username=username,
@@ -187,23 +244,56 @@ class UserManagementDialog(QDialog):
                     role=UserRole(role)
                 )
 
-                db.add(new_user)
-                db.commit()
+                with session_scope() as db:
+                    db.add(new_user)
                 self.load_users()
                 QMessageBox.information(self, "Успех", "Пользователь успешно создан")
 
             except Exception as e:
-                db.rollback()
                 QMessageBox.critical(self, "Ошибка", f"Ошибка создания пользователя: {str(e)}")
 
+    def import_csv(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Импорт пользователей", "", "CSV (*.csv)"
+        )
+        if not file_path or self.import_worker is not None:
+            return
+
+        # Хеширование тысяч паролей занимает минуты — выполняем в фоне
+        self.import_btn.setEnabled(False)
+        self.import_btn.setText("Импорт…")
+        self.import_worker = Worker(import_users, file_path)
+        self.import_worker.signals.finished.connect(self.on_import_finished)
+        self.import_worker.signals.failed.connect(self.on_import_failed)
+        QThreadPool.globalInstance().start(self.import_worker)
+
+    def finish_import(self):
+        self.import_worker = None
+        self.import_btn.setEnabled(True)
+        self.import_btn.setText("Импорт из CSV")
+
+    def on_import_finished(self, worker, report):
+        self.finish_import()
+        self.load_users()
+        box = QMessageBox(
+            QMessageBox.Icon.Warning if report.errors else QMessageBox.Icon.Information,
+            "Импорт пользователей", report.summary(), parent=self
+        )
+        if report.errors:
+            box.setDetailedText("\n".join(report.error_lines()))
+        box.exec()
+
+    def on_import_failed(self, worker, message):
+        self.finish_import()
+        QMessageBox.critical(self, "Ошибка", f"Не удалось импортировать пользователей:\n{message}")
+
     def delete_user(self):
         selected = self.table.selectionModel().selectedRows()
         if not selected:
             QMessageBox.warning(self, "Ошибка", "Выберите пользователя для удаления")
             return
 
-        index = selected[0].row()
-        user_id = self.table.model()._data[index].id
+        user_id = self.user_model.user_id(selected[0].row())
 
         if user_id == self.current_user.id:
             QMessageBox.warning(self, "Ошибка", "Нельзя удалить текущего пользователя")
@@ -218,19 +308,16 @@ class UserManagementDialog(QDialog):
 
         if confirm == QMessageBox.StandardButton.Yes:
             try:
-                db = next(get_db())
-                user = db.query(User).get(user_id)
-                db.delete(user)
-                db.commit()
+                with session_scope() as db:
+                    user = db.query(User).get(user_id)
+                    db.delete(user)
                 self.load_users()
                 QMessageBox.information(self, "Успех", "Пользователь успешно удален")
             except IntegrityError:
-                db.rollback()
                 QMessageBox.critical(
                     self,
                     "Ошибка",
                     "Нельзя удалить пользователя с существующими заявками"
                 )
             except Exception as e:
-                db.rollback()
                 QMessageBox.critical(self, "Ошибка", f"Ошибка удаления: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,52 @@
+import traceback
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from sql_stats import sql_action
+
+
+class WorkerSignals(QObject):
+    # Первым аргументом передается сам Worker, чтобы получатель мог отбросить устаревший результат
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(object, str)
+
+
+def action_name(fn):
+    """Имя действия для журнала запросов: имя функции, в том числе под functools.partial"""
+    while hasattr(fn, "func"):
+        fn = fn.func
+    return getattr(fn, "__name__", "background")
+
+
+class Worker(QRunnable):
+    """Выполняет fn(*args, **kwargs) в пуле потоков и возвращает результат сигналом.
+
+    Запросы задачи попадают в журнал под именем действия action (по умолчанию — имя fn).
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.action = action_name(fn)
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        """Результат отмененной задачи не будет доставлен"""
+        self.cancelled = True
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            with sql_action(self.action):
+                result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            if not self.cancelled:
+                self.signals.failed.emit(self, str(e))
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(self, result)
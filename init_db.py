@@ -1,6 +1,57 @@
-from database import engine, Base
+from sqlalchemy import inspect, text
+
+from database import engine, Base, maintenance_transaction
 from models import User, Ticket
+from ticket_notify import install_notify_trigger
+from ticket_search import install_search
+import ticket_rollup
+
+
+def add_missing_columns(conn):
+    """ALTER TABLE ... ADD COLUMN для колонок, появившихся в моделях позже таблиц"""
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and not column.computed:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+
+def upgrade_schema(bind):
+    """Приводит существующие таблицы к моделям: досоздает индексы и умолчания.
+
+    create_all создает индексы только вместе с новой таблицей.
+    """
+    with maintenance_transaction(bind) as conn:
+        add_missing_columns(conn)
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("ALTER TABLE tickets ALTER COLUMN updated_at SET DEFAULT now()"))
+        # Старые заявки без updated_at иначе не попадут в догрузку по водяному знаку
+        conn.execute(text("UPDATE tickets SET updated_at = created_at WHERE updated_at IS NULL"))
+        # Колонка версии добавлена без умолчания — старым строкам нужна начальная версия
+        conn.execute(text("UPDATE tickets SET version = 1 WHERE version IS NULL"))
+        # Для уже закрытых заявок лучшая оценка времени закрытия — последнее изменение
+        conn.execute(text(
+            "UPDATE tickets SET closed_at = updated_at WHERE status = 'CLOSED' AND closed_at IS NULL"
+        ))
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
 
 if __name__ == '__main__':
+    had_rollup = inspect(engine).has_table("ticket_daily_stats")
     Base.metadata.create_all(bind=engine)
-    print("Database tables created!")
\ No newline at end of file
+    upgrade_schema(engine)
+    install_notify_trigger(engine)
+    install_search(engine)
+    if not had_rollup:
+        # Новая сводка должна сразу учесть уже существующие заявки
+        with maintenance_transaction(engine) as conn:
+            ticket_rollup.backfill(conn)
+    print("Database tables created!")
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Date, Enum, Index, event
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from database import Base
 import enum
@@ -27,6 +27,10 @@ class User(Base):
     full_name = Column(String(100))
     role = Column(Enum(UserRole))
 
+    __table_args__ = (
+        Index("ix_users_role", "role", "id"),  # Фильтр и сортировка по роли, списки техников
+    )
+
     created_tickets = relationship(
         "Ticket",
         foreign_keys="[Ticket.client_id]",
@@ -45,12 +49,16 @@ class Ticket(Base):
 
     id = Column(Integer, primary_key=True)
     title = Column(String(100))
-    description = Column(Text)
+    description = deferred(Column(Text))  # Не нужен спискам и отчетам — грузим по требованию
     status = Column(Enum(TicketStatus), default=TicketStatus.OPEN)
     priority = Column(String(20))
     category = Column(String(50))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Заполняется и при вставке: по нему клиенты догружают изменения (водяной знак)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    closed_at = Column(DateTime(timezone=True))  # Для сводок по времени закрытия
+    # Оптимистическая блокировка: UPDATE из ORM проверяет версию и увеличивает ее
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     client_id = Column(Integer, ForeignKey("users.id"))
     technician_id = Column(Integer, ForeignKey("users.id"))
@@ -67,6 +75,25 @@ class Ticket(Base):
         back_populates="assigned_tickets"
     )
 
+    # Индексы под реальные выборки: списки упорядочены по (created_at, id) и фильтруются по дню
+    __table_args__ = (
+        Index("ix_tickets_client_created", "client_id", "created_at", "id"),  # Заявки клиента
+        Index("ix_tickets_technician_status", "technician_id", "status"),  # Заявки техника по статусу
+        Index("ix_tickets_status_created", "status", "created_at", "id"),  # Фильтр по статусу и дате
+        Index("ix_tickets_created", "created_at", "id"),  # Общий список и отчеты за период
+        Index("ix_tickets_updated", "updated_at"),  # Догрузка изменений после водяного знака
+    )
+    __mapper_args__ = {"version_id_col": version}
+
+
+@event.listens_for(Ticket.status, "set")
+def _track_closed_at(ticket, status, old_status, initiator):
+    if status == TicketStatus.CLOSED:
+        if old_status != TicketStatus.CLOSED:
+            ticket.closed_at = func.now()
+    elif old_status == TicketStatus.CLOSED:
+        ticket.closed_at = None  # Переоткрытая заявка снова в работе
+
 
 class TicketHistory(Base):
     __tablename__ = "ticket_history"
@@ -78,3 +105,23 @@ class TicketHistory(Base):
     old_value = Column(String(100))
     new_value = Column(String(100))
     changed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_ticket_history_ticket_changed", "ticket_id", "changed_at"),  # История одной заявки
+    )
+
+
+class TicketDailyStat(Base):
+    """Суточная сводка: сколько заявок с данными статусом/приоритетом/техником открыто и закрыто в день.
+
+    Поддерживается инкрементально (см. ticket_rollup), чтобы отчеты за месяцы и годы
+    читали сотни строк сводки вместо миллионов заявок.
+    """
+    __tablename__ = "ticket_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    status = Column(Enum(TicketStatus), primary_key=True)
+    priority = Column(String(20), primary_key=True, default="")  # "" — без приоритета
+    technician_id = Column(Integer, primary_key=True, default=0)  # 0 — не назначен
+    opened = Column(Integer, nullable=False, default=0)
+    closed = Column(Integer, nullable=False, default=0)
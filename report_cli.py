@@ -0,0 +1,124 @@
+"""Формирование отчетов без GUI — для запуска по расписанию (cron, планировщик задач).
+
+Права и охват отчета те же, что в окне отчетов: администратор видит все заявки,
+техник — назначенные ему. Строки читаются потоково, поэтому память не растет с периодом.
+Отчет за период без изменений берется из дискового кэша (gui/report_cache.py), --no-cache
+отключает его.
+
+    python report_cli.py --start 2024-01-01 --end 2024-01-31 --format csv excel pdf -o reports/
+    python report_cli.py --start 2024-01-01 --end 2024-01-31 --technician tech1 --format pdf
+
+Код выхода: 0 — успех (в том числе пустой период), 1 — ошибка.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from database import session_scope, sql_action
+from models import User, UserRole
+from gui.report_cache import ReportCache
+from gui.report_generator import ReportGenerator
+
+FORMAT_ALIASES = {"pdf": "PDF", "excel": "Excel", "xlsx": "Excel", "csv": "CSV"}
+EXTENSIONS = {"PDF": "pdf", "Excel": "xlsx", "CSV": "csv"}
+REPORT_ROLES = (UserRole.ADMIN, UserRole.TECHNICIAN)  # Как в главном окне: клиенты отчеты не строят
+
+
+def find_user(username=None, role=None):
+    """Пользователь, от имени которого строится отчет; по умолчанию — первый администратор"""
+    with session_scope() as db:
+        query = db.query(User)
+        if username:
+            query = query.filter(User.username == username)
+        else:
+            query = query.filter(User.role == UserRole.ADMIN).order_by(User.id)
+        user = query.first()
+    if user is None:
+        raise SystemExit(f"Пользователь {username or '(администратор)'} не найден")
+    if role is not None and user.role != role:
+        raise SystemExit(f"Пользователь {user.username} не {role.value}")
+    if user.role not in REPORT_ROLES:
+        raise SystemExit(f"Пользователю {user.username} ({user.role.value}) отчеты недоступны")
+    return user
+
+
+def output_path(output, user, start_date, end_date, report_format, several):
+    """Файл отчета: --output может быть каталогом (или оканчиваться на /) либо именем файла"""
+    extension = EXTENSIONS[report_format]
+    name = f"report_{start_date:%Y%m%d}_{end_date:%Y%m%d}_{user.username}.{extension}"
+    if output is None:
+        return name
+    if os.path.isdir(output) or output.endswith(("/", os.sep)):
+        os.makedirs(output, exist_ok=True)
+        return os.path.join(output, name)
+    base, _ = os.path.splitext(output)
+    # Для нескольких форматов имя файла служит основой, расширение подставляется свое
+    return f"{base}.{extension}" if several else output
+
+
+def print_progress(report_format):
+    def progress(written, total):
+        print(f"\r  {report_format}: {written}/{total}", end="", file=sys.stderr, flush=True)
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Отчет по заявкам без GUI")
+    parser.add_argument("--start", type=date.fromisoformat, help="Первый день (по умолчанию — 30 дней назад)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Последний день (по умолчанию — сегодня)")
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument("--user", help="Логин, с правами которого строится отчет (по умолчанию — администратор)")
+    scope.add_argument("--technician", help="Отчет по заявкам техника с этим логином")
+    parser.add_argument("--format", nargs="+", default=["pdf"], choices=sorted(FORMAT_ALIASES),
+                        help="Один или несколько форматов")
+    parser.add_argument("-o", "--output", help="Файл или каталог (по умолчанию — текущий каталог)")
+    parser.add_argument("--progress", action="store_true", help="Показывать прогресс в stderr")
+    parser.add_argument("--no-cache", action="store_true", help="Строить заново, не заглядывая в кэш отчетов")
+    args = parser.parse_args()
+
+    end_date = args.end or date.today()
+    start_date = args.start or end_date - timedelta(days=30)
+    if start_date > end_date:
+        raise SystemExit("Начальная дата позже конечной")
+
+    if args.technician:
+        user = find_user(args.technician, UserRole.TECHNICIAN)
+    else:
+        user = find_user(args.user)
+    formats = list(dict.fromkeys(FORMAT_ALIASES[name] for name in args.format))
+    generator = ReportGenerator(user, start_date, end_date, cache=None if args.no_cache else ReportCache())
+
+    started = time.perf_counter()
+    failed = False
+    for report_format in formats:
+        file_path = output_path(args.output, user, start_date, end_date, report_format, len(formats) > 1)
+        format_started = time.perf_counter()
+        try:
+            with sql_action("report_cli"):
+                written = generator.generate(
+                    report_format, file_path, progress=print_progress(report_format) if args.progress else None
+                )
+        except Exception as e:
+            failed = True
+            print(f"{report_format}: ошибка — {e}", file=sys.stderr)
+            continue
+        finally:
+            if args.progress:
+                print(file=sys.stderr)
+
+        seconds = time.perf_counter() - format_started
+        if written == 0:
+            print(f"{report_format}: нет заявок за {start_date}–{end_date}, файл не создан")
+            continue
+        size_kib = os.path.getsize(file_path) / 1024
+        print(f"{report_format}: {file_path} — строк {written}, {size_kib:.0f} КиБ, "
+              f"{seconds:.2f} с ({written / max(seconds, 1e-6):.0f} строк/с)")
+
+    print(f"Готово за {time.perf_counter() - started:.2f} с")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Журнал SQL по действиям пользователя: время запросов, медленные запросы и N+1.
+
+Отдельно от database.py и без зависимости от SQLAlchemy, чтобы фоновые задачи окна входа
+могли помечать действия, не загружая ORM до первого запроса. Запросы сюда передают
+обработчики событий engine из database.py.
+"""
+import logging
+import os
+import re
+import threading
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Инструментирование запросов
+SLOW_QUERY_MS = float(os.environ.get("SUPPORT_SLOW_QUERY_MS", "500"))  # Порог журнала медленных запросов
+SLOW_QUERY_LOG = os.environ.get("SUPPORT_SLOW_QUERY_LOG")  # Файл журнала; без него — в stderr
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("SUPPORT_N_PLUS_ONE_THRESHOLD", "20"))  # Одинаковых запросов на действие
+
+
+sql_logger = logging.getLogger("support.sql")
+if SLOW_QUERY_LOG:
+    _handler = logging.FileHandler(SLOW_QUERY_LOG, encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    sql_logger.addHandler(_handler)
+
+
+class ActionScope:
+    """Запросы одного действия пользователя (load_tickets, generate_report, ...)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+        self.total_ms = 0.0
+        self.statements = Counter()
+
+
+current_action = ContextVar("current_action", default=None)
+
+
+@contextmanager
+def sql_action(name):
+    """Помечает запросы внутри блока именем действия; контекст свой у каждого потока"""
+    scope = ActionScope(name)
+    token = current_action.set(scope)
+    try:
+        yield scope
+    finally:
+        current_action.reset(token)
+        query_stats.finish_action(scope)
+
+
+def short_statement(statement, length=200):
+    return re.sub(r"\s+", " ", statement).strip()[:length]
+
+
+class QueryStats:
+    """Время и число строк последних запросов, итоги действий, медленные запросы и N+1"""
+
+    RECENT = 200
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.recent = deque(maxlen=self.RECENT)  # (действие, запрос, мс, строк)
+        self.last_action = None  # (действие, запросов, мс)
+        self.slow_queries = 0
+        self.n_plus_one = deque(maxlen=50)  # (действие, запрос, повторов)
+
+    def record(self, statement, elapsed_ms, rows):
+        scope = current_action.get()
+        action = scope.name if scope else None
+        repeats = 0
+        with self._lock:
+            self.recent.append((action, short_statement(statement), elapsed_ms, rows))
+            if scope is not None:
+                scope.queries += 1
+                scope.total_ms += elapsed_ms
+                scope.statements[statement] += 1
+                repeats = scope.statements[statement]
+            if elapsed_ms >= SLOW_QUERY_MS:
+                self.slow_queries += 1
+            if repeats == N_PLUS_ONE_THRESHOLD:
+                self.n_plus_one.append((action, short_statement(statement), repeats))
+
+        if elapsed_ms >= SLOW_QUERY_MS:
+            sql_logger.warning(
+                "Медленный запрос %.1f мс, строк %s, действие %s: %s",
+                elapsed_ms, rows, action or "—", short_statement(statement, 2000)
+            )
+        if repeats == N_PLUS_ONE_THRESHOLD:
+            sql_logger.warning(
+                "Возможный N+1: действие %s выполнило один и тот же запрос %d раз: %s",
+                action, repeats, short_statement(statement)
+            )
+
+    def finish_action(self, scope):
+        with self._lock:
+            self.last_action = (scope.name, scope.queries, scope.total_ms)
+
+    def recent_queries(self, limit=10):
+        with self._lock:
+            return list(self.recent)[-limit:]
+
+
+query_stats = QueryStats()
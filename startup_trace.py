@@ -0,0 +1,76 @@
+"""Замер холодного старта: от запуска app.py до появления окна входа.
+
+Включается переменной SUPPORT_STARTUP_TRACE=1. В stderr печатаются этапы запуска и дерево
+самых долгих импортов в духе python -X importtime (время включает вложенные импорты),
+а также предупреждение, если старт дольше SUPPORT_STARTUP_TARGET_MS. Время запуска
+самого интерпретатора сюда не входит.
+"""
+import builtins
+import os
+import sys
+import threading
+import time
+
+TARGET_MS = float(os.environ.get("SUPPORT_STARTUP_TARGET_MS", "1000"))
+MIN_IMPORT_MS = 5.0  # Импорты быстрее не показываются
+MAX_IMPORT_DEPTH = 3
+
+
+class StartupTrace:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases = []  # (этап, момент окончания)
+        self.imports = []  # [модуль, глубина, мс] в порядке начала импорта
+        self._depth = 0
+        self._thread = threading.get_ident()
+        self._original_import = builtins.__import__
+        if enabled:
+            builtins.__import__ = self._traced_import
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get("SUPPORT_STARTUP_TRACE", "") not in ("", "0"))
+
+    def _traced_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Считаем только первые импорты в главном потоке; повторные стоят одного поиска в sys.modules
+        if level or name in sys.modules or threading.get_ident() != self._thread:
+            return self._original_import(name, globals, locals, fromlist, level)
+        entry = [name, self._depth, 0.0]
+        self.imports.append(entry)
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            entry[2] = (time.perf_counter() - started) * 1000
+            self._depth -= 1
+
+    def mark(self, phase):
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter()))
+
+    def finish(self, phase):
+        """Последний этап: снимает перехват импортов и печатает отчет"""
+        if not self.enabled:
+            return
+        self.mark(phase)
+        builtins.__import__ = self._original_import
+        self.enabled = False
+
+        out = sys.stderr
+        print("Старт приложения:", file=out)
+        previous = self.started
+        for name, moment in self.phases:
+            print(f"  {name:32} {(moment - previous) * 1000:8.1f} мс  "
+                  f"(с начала {(moment - self.started) * 1000:.1f})", file=out)
+            previous = moment
+
+        print(f"Импорты дольше {MIN_IMPORT_MS:.0f} мс (с вложенными):", file=out)
+        for name, depth, elapsed in self.imports:
+            if elapsed >= MIN_IMPORT_MS and depth < MAX_IMPORT_DEPTH:
+                print(f"  {elapsed:8.1f} мс  {'  ' * depth}{name}", file=out)
+
+        total = (self.phases[-1][1] - self.started) * 1000
+        verdict = "в пределах цели" if total <= TARGET_MS else "ДОЛЬШЕ ЦЕЛИ"
+        print(f"Итого {total:.0f} мс — {verdict} {TARGET_MS:.0f} мс", file=out)
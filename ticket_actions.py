@@ -0,0 +1,137 @@
+from collections import Counter
+
+from sqlalchemy import case, func, select, update
+
+from models import Ticket, TicketStatus
+from ticket_history import history_rows, write_history
+from ticket_rollup import apply_cells, apply_contributions
+
+# Поля, которые можно менять массово
+BULK_FIELDS = ("status", "priority", "technician_id")
+
+
+def bulk_values(values):
+    """SET-часть UPDATE: closed_at выставляется/сбрасывается вместе со статусом, как в ORM"""
+    set_values = {getattr(Ticket, field): value for field, value in values.items()}
+    set_values[Ticket.version] = Ticket.version + 1  # Открытые диалоги редактирования увидят конфликт
+    status = values.get("status")
+    if status == TicketStatus.CLOSED:
+        # Уже закрытые сохраняют исходное время закрытия
+        set_values[Ticket.closed_at] = case(
+            (Ticket.status == TicketStatus.CLOSED, Ticket.closed_at), else_=func.now()
+        )
+    elif status is not None:
+        set_values[Ticket.closed_at] = None
+    return set_values
+
+
+def bulk_update(db, ticket_ids, values, changed_by):
+    """Меняет поля values у всех заявок ticket_ids одним UPDATE ... WHERE id IN (...).
+
+    В той же транзакции: блокировка и чтение старых значений, журнал одним INSERT и
+    поправка суточной сводки. Возвращает число реально измененных заявок.
+    """
+    unknown = set(values) - set(BULK_FIELDS)
+    if unknown:
+        raise ValueError(f"Массово нельзя менять поля: {', '.join(sorted(unknown))}")
+    if not ticket_ids or not values:
+        return 0
+
+    columns = [getattr(Ticket, field) for field in values]
+    old_rows = db.execute(
+        select(Ticket.id, *columns).where(Ticket.id.in_(ticket_ids)).with_for_update()
+    ).all()
+
+    changes = []
+    changed_ids = []
+    for row in old_rows:
+        row_changes = [
+            (field, getattr(row, field), new)
+            for field, new in values.items()
+            if getattr(row, field) != new
+        ]
+        if row_changes:
+            changed_ids.append(row.id)
+            changes.extend(history_rows(row.id, row_changes, changed_by))
+    if not changed_ids:
+        return 0
+
+    connection = db.connection()
+    selected = Ticket.id.in_(changed_ids)
+    apply_contributions(connection, selected, -1)
+    db.execute(
+        update(Ticket).where(selected).values(bulk_values(values)),
+        execution_options={"synchronize_session": False}
+    )
+    apply_contributions(connection, selected, 1)
+    write_history(db, changes)
+    return len(changed_ids)
+
+
+def _claim_rows(db, claimable, set_values):
+    """UPDATE свободных заявок; возвращает [(id, старый статус, старый closed_at, created_at, priority)]"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Один оператор: CTE блокирует строки и отдает старый статус, UPDATE повторно
+        # проверяет technician_id IS NULL — второй техник после ожидания блокировки получит 0 строк
+        old = select(Ticket.id, Ticket.status, Ticket.closed_at).where(*claimable).with_for_update().cte("old")
+        statement = (
+            update(Ticket)
+            .where(Ticket.id == old.c.id, Ticket.technician_id.is_(None))
+            .values(set_values)
+            .returning(Ticket.id, old.c.status, old.c.closed_at, Ticket.created_at, Ticket.priority)
+        )
+        return db.execute(statement, execution_options={"synchronize_session": False}).all()
+
+    # SQLite: RETURNING видит только новые значения, а запись и так сериализована блокировкой базы
+    old = {row.id: row for row in db.execute(select(Ticket.id, Ticket.status, Ticket.closed_at).where(*claimable))}
+    statement = (
+        update(Ticket)
+        .where(*claimable)
+        .values(set_values)
+        .returning(Ticket.id, Ticket.created_at, Ticket.priority)
+    )
+    rows = db.execute(statement, execution_options={"synchronize_session": False}).all()
+    return [
+        (row.id, old[row.id].status, old[row.id].closed_at, row.created_at, row.priority) for row in rows
+    ]
+
+
+def claim_tickets(db, ticket_ids, technician_id):
+    """Назначает технику свободные заявки одним условным UPDATE ... WHERE technician_id IS NULL.
+
+    Уже занятые заявки пропускаются без ошибки; двойное назначение невозможно.
+    Возвращает список id реально взятых заявок.
+    """
+    if not ticket_ids:
+        return []
+    claimable = (
+        Ticket.id.in_(ticket_ids),
+        Ticket.technician_id.is_(None),
+    )
+    set_values = {
+        Ticket.technician_id: technician_id,
+        Ticket.status: TicketStatus.IN_PROGRESS,
+        Ticket.closed_at: None,  # Как в ORM: заявка снова в работе
+        Ticket.version: Ticket.version + 1,
+    }
+    claimed = _claim_rows(db, claimable, set_values)
+
+    # Вклад opened переезжает в ячейку техника; свободная закрытая заявка теряет еще и вклад closed
+    deltas = Counter()
+    closed = Counter()
+    changes = []
+    for ticket_id, old_status, closed_at, created_at, priority in claimed:
+        day, priority = created_at.date(), priority or ""
+        deltas[(day, old_status, priority, 0)] -= 1
+        deltas[(day, TicketStatus.IN_PROGRESS, priority, technician_id)] += 1
+        if closed_at is not None:
+            closed[(closed_at.date(), old_status, priority, 0)] -= 1
+        row_changes = [("technician_id", None, technician_id)]
+        if old_status != TicketStatus.IN_PROGRESS:
+            row_changes.append(("status", old_status, TicketStatus.IN_PROGRESS))
+        changes.extend(history_rows(ticket_id, row_changes, technician_id))
+    apply_cells(db.connection(), {
+        key: (deltas[key], closed[key]) for key in deltas.keys() | closed.keys()
+    })
+    write_history(db, changes)
+    return [row[0] for row in claimed]
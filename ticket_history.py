@@ -0,0 +1,58 @@
+import enum
+
+from sqlalchemy import insert, inspect
+
+from models import TicketHistory
+
+# Поля заявки, изменения которых попадают в журнал
+AUDITED_FIELDS = ("title", "description", "status", "priority", "technician_id", "client_id")
+VALUE_LENGTH = 100  # Размер колонок old_value / new_value
+
+
+def format_value(value):
+    if value is None:
+        return None
+    if isinstance(value, enum.Enum):
+        value = value.value
+    return str(value)[:VALUE_LENGTH]
+
+
+def dirty_changes(ticket):
+    """[(поле, старое, новое)] для реально измененных полей загруженной заявки"""
+    attrs = inspect(ticket).attrs
+    changes = []
+    for field in AUDITED_FIELDS:
+        history = attrs[field].history
+        if not history.has_changes():
+            continue
+        old = history.deleted[0] if history.deleted else None
+        new = history.added[0] if history.added else None
+        if old != new:
+            changes.append((field, old, new))
+    return changes
+
+
+def history_rows(ticket_id, changes, changed_by):
+    return [
+        {
+            "ticket_id": ticket_id,
+            "changed_by": changed_by,
+            "field": field,
+            "old_value": format_value(old),
+            "new_value": format_value(new),
+        }
+        for field, old, new in changes
+    ]
+
+
+def write_history(db, rows):
+    """Один многострочный INSERT в текущей транзакции"""
+    if rows:
+        db.execute(insert(TicketHistory).values(rows))
+
+
+def record_changes(db, ticket, changed_by):
+    """Пишет в журнал изменения ticket, еще не сброшенные в БД; вызывать до commit"""
+    rows = history_rows(ticket.id, dirty_changes(ticket), changed_by)
+    write_history(db, rows)
+    return rows
@@ -0,0 +1,96 @@
+import select
+import threading
+
+from sqlalchemy import text
+
+CHANNEL = "tickets_changed"
+
+# Триггер уровня оператора: массовое обновление дает одно уведомление, а не по строке
+NOTIFY_TRIGGER_DDL = (
+    f"""
+    CREATE OR REPLACE FUNCTION notify_tickets_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{CHANNEL}', '');
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS tickets_changed_notify ON tickets",
+    """
+    CREATE TRIGGER tickets_changed_notify
+    AFTER INSERT OR UPDATE OR DELETE ON tickets
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_tickets_changed()
+    """,
+)
+
+
+def install_notify_trigger(bind):
+    """Создает триггер NOTIFY на tickets (только PostgreSQL)"""
+    if bind.dialect.name != "postgresql":
+        return False
+    with bind.begin() as conn:
+        for statement in NOTIFY_TRIGGER_DDL:
+            conn.execute(text(statement))
+    return True
+
+
+class TicketChangeListener:
+    """Слушает LISTEN tickets_changed в отдельном потоке и вызывает callback() на каждое уведомление.
+
+    Держит собственное соединение вне пула. Для не-PostgreSQL баз start() возвращает False,
+    и вызывающая сторона переходит на опрос по таймеру.
+    """
+
+    POLL_TIMEOUT = 1.0  # Как часто проверять флаг остановки, с
+
+    def __init__(self, bind, callback):
+        self.bind = bind
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread = None
+        self._connection = None
+
+    def start(self):
+        if self.bind.dialect.name != "postgresql":
+            return False
+        try:
+            raw = self.bind.raw_connection()
+            raw.detach()  # Соединение живет все время работы окна — не занимаем слот пула
+            connection = getattr(raw, "dbapi_connection", None) or raw.connection
+            connection.rollback()  # pre-ping мог открыть транзакцию
+            connection.set_session(autocommit=True)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+        except Exception:
+            return False
+
+        self._connection = connection
+        self._thread = threading.Thread(target=self._run, name="ticket-listener", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.POLL_TIMEOUT * 2)
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        connection = self._connection
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([connection], [], [], self.POLL_TIMEOUT)
+                if not ready:
+                    continue
+                connection.poll()
+                if connection.notifies:
+                    connection.notifies.clear()
+                    self.callback()
+        except Exception:
+            # Соединение потеряно — вызывающая сторона увидит is_alive() == False и включит опрос
+            pass
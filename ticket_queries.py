@@ -0,0 +1,130 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import func, or_, and_
+from sqlalchemy.orm import aliased
+
+from models import Ticket, User, UserRole
+
+Technician = aliased(User, name="technician")
+
+# Узкая проекция для списков: без description и без загрузки объектов User
+TICKET_ROW_COLUMNS = (
+    Ticket.id,
+    Ticket.title,
+    Ticket.status,
+    Ticket.priority,
+    Ticket.created_at,
+    Ticket.technician_id,
+    Technician.full_name.label("technician_name"),
+    Ticket.updated_at,
+)
+
+
+def day_range(start_date, end_date=None):
+    """Полуоткрытый интервал [start 00:00, end+1 00:00) для фильтрации по дням.
+
+    В отличие от func.date(created_at) == date такое условие использует индекс по created_at.
+    """
+    end_date = end_date or start_date
+    return (
+        datetime.combine(start_date, time.min),
+        datetime.combine(end_date + timedelta(days=1), time.min),
+    )
+
+
+def created_between(start_date, end_date=None):
+    start, end = day_range(start_date, end_date)
+    return and_(Ticket.created_at >= start, Ticket.created_at < end)
+
+
+def ticket_rows_query(db):
+    """Один запрос с LEFT JOIN на техника вместо ленивой загрузки на каждую строку"""
+    return db.query(*TICKET_ROW_COLUMNS).outerjoin(
+        Technician, Ticket.technician_id == Technician.id
+    )
+
+
+def visible_to(query, user):
+    """Клиенты видят только свои заявки"""
+    if user.role == UserRole.CLIENT:
+        query = query.filter(Ticket.client_id == user.id)
+    return query
+
+
+def fetch_ticket_page(db, user, status=None, date=None, after=None, limit=200):
+    """Страница заявок для главного окна, упорядоченная от новых к старым.
+
+    after — последняя строка предыдущей страницы (keyset-пагинация).
+    """
+    query = ticket_rows_query(db)
+
+    if status is not None:
+        query = query.filter(Ticket.status == status)
+
+    if date is not None:
+        query = query.filter(created_between(date))
+
+    query = visible_to(query, user)
+
+    if after is not None:
+        query = query.filter(or_(
+            Ticket.created_at < after.created_at,
+            and_(Ticket.created_at == after.created_at, Ticket.id < after.id)
+        ))
+
+    return query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit).all()
+
+
+def report_scope(query, user):
+    """Техник получает в отчетах только назначенные ему заявки"""
+    if user.role == UserRole.TECHNICIAN:
+        query = query.filter(Ticket.technician_id == user.id)
+    return query
+
+
+def report_rows_query(db, user, start_date, end_date):
+    """Заявки за период для отчетов"""
+    query = report_scope(ticket_rows_query(db).filter(created_between(start_date, end_date)), user)
+    return query.order_by(Ticket.created_at, Ticket.id)
+
+
+def report_watermark(db, user, start_date, end_date):
+    """(строк в отчете, последнее изменение) — меняется, когда меняется хоть что-то в отчете.
+
+    Кроме заявок периода учитываются более ранние, закрытые в периоде или позже либо
+    открытые: от них зависят число закрытых и хвост открытых в сводке. Такие заявки попадают
+    в это множество только через изменение (закрытие или повторное открытие), поэтому
+    достаточно изменений начиная с первого дня периода — их находит индекс по updated_at.
+    """
+    start, _ = day_range(start_date, end_date)
+    rows, period_change = report_scope(
+        db.query(func.count(Ticket.id), func.max(Ticket.updated_at)).filter(created_between(start_date, end_date)),
+        user
+    ).one()
+    earlier_change = report_scope(
+        db.query(func.max(Ticket.updated_at)).filter(
+            Ticket.updated_at >= start,
+            Ticket.created_at < start,
+            or_(Ticket.closed_at.is_(None), Ticket.closed_at >= start),
+        ),
+        user
+    ).scalar()
+    return rows, max(filter(None, (period_change, earlier_change)), default=None)
+
+
+def latest_change(db, user):
+    """Водяной знак: время последнего изменения среди видимых пользователю заявок"""
+    return visible_to(db.query(func.max(Ticket.updated_at)), user).scalar()
+
+
+def fetch_ticket_changes(db, user, since, limit=1000, after_id=None):
+    """Заявки, измененные после since, в порядке изменения (без фильтров списка).
+
+    after_id — продолжение после строки (since, after_id): у заявок из одного массового
+    изменения одинаковый updated_at, и граница страницы может прийтись на середину группы.
+    """
+    changed = Ticket.updated_at > since
+    if after_id is not None:
+        changed = or_(changed, and_(Ticket.updated_at == since, Ticket.id > after_id))
+    query = visible_to(ticket_rows_query(db).filter(changed), user)
+    return query.order_by(Ticket.updated_at, Ticket.id).limit(limit).all()
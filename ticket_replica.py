@@ -0,0 +1,216 @@
+"""Локальная копия заявок пользователя в SQLite — для мгновенного старта и просмотра офлайн.
+
+В копии лежат те же строки, что показывает главное окно (проекция TICKET_ROW_COLUMNS),
+и только видимые пользователю заявки. Копия догружается по updated_at: sync() забирает
+изменения после сохраненного водяного знака пачками по SYNC_BATCH. Заявки из БД не
+удаляются, поэтому догрузки по updated_at достаточно, чтобы копия совпадала с сервером.
+
+Включается переменной SUPPORT_REPLICA=1; файлы — в SUPPORT_REPLICA_DIR, по одному на
+сервер и пользователя. Копию можно удалить в любой момент — она соберется заново.
+"""
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import (
+    Column, Enum, Index, Integer, MetaData, String, Table, TypeDecorator, and_, create_engine, event,
+    or_, select,
+)
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import make_url
+
+from database import DATABASE_URL, session_scope
+from models import TicketStatus
+from ticket_queries import day_range, fetch_ticket_changes
+
+REPLICA_ENABLED = os.environ.get("SUPPORT_REPLICA", "") not in ("", "0")
+REPLICA_DIR = os.environ.get("SUPPORT_REPLICA_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "support_desk", "replica"
+)
+SCHEMA_VERSION = 2  # При изменении схемы копия пересобирается
+SYNC_BATCH = 5000
+# Как в TicketSync: транзакция может зафиксироваться позже, чем выставлен ее now()
+OVERLAP = timedelta(seconds=5)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+ROW_FIELDS = ("id", "title", "status", "priority", "created_at", "technician_id", "technician_name", "updated_at")
+
+
+class IsoDateTime(TypeDecorator):
+    """Дата и время ISO-строкой: в отличие от DateTime в SQLite сохраняет часовой пояс.
+
+    Значения с часовым поясом хранятся в UTC, поэтому сравниваются и сортируются как строки
+    независимо от часового пояса сессии, в котором их отдал сервер. Читаются они в местном
+    времени. Значения без пояса (сервер SQLite) хранятся как есть.
+    """
+
+    impl = String(32)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.isoformat(timespec="microseconds")
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        value = datetime.fromisoformat(value)
+        return value.astimezone() if value.tzinfo is not None else value
+
+
+metadata = MetaData()
+
+tickets = Table(
+    "tickets", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String),
+    Column("status", Enum(TicketStatus)),
+    Column("priority", String),
+    Column("created_at", IsoDateTime),
+    Column("technician_id", Integer),
+    Column("technician_name", String),
+    Column("updated_at", IsoDateTime),
+    Index("ix_replica_created", "created_at", "id"),
+    Index("ix_replica_status_created", "status", "created_at", "id"),
+)
+
+replica_state = Table(
+    "replica_state", metadata,
+    Column("key", String, primary_key=True),
+    Column("value", String),
+)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL: окно читает копию, пока фоновая синхронизация пишет в нее
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+def server_timestamps_aware():
+    """Отдает ли сервер время с часовым поясом: SQLite хранит его без пояса"""
+    return make_url(DATABASE_URL).get_backend_name() != "sqlite"
+
+
+def replica_path(user, directory=REPLICA_DIR):
+    """Файл копии: свой для каждого сервера БД и пользователя"""
+    url = make_url(DATABASE_URL)
+    server = hashlib.sha1(f"{url.drivername}://{url.host}:{url.port}/{url.database}".encode()).hexdigest()[:12]
+    return os.path.join(directory, f"tickets_{server}_{user.id}.db")
+
+
+def open_replica(user):
+    """LocalReplica пользователя или None, если копия выключена"""
+    return LocalReplica(user) if REPLICA_ENABLED else None
+
+
+class LocalReplica:
+    def __init__(self, user, path=None):
+        self.user = user
+        self.path = path or replica_path(user)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.engine = create_engine(f"sqlite:///{self.path}", connect_args={"check_same_thread": False})
+        event.listen(self.engine, "connect", _sqlite_pragmas)
+        self._sync_lock = threading.Lock()
+        metadata.create_all(self.engine)
+        self._check_owner()
+
+    def _check_owner(self):
+        # Видимость зависит от роли: после смены роли или схемы старая копия не годится
+        owner = {"schema": str(SCHEMA_VERSION), "role": self.user.role.value}
+        state = self._state()
+        if all(state.get(key) == value for key, value in owner.items()):
+            return
+        with self.engine.begin() as conn:
+            conn.execute(tickets.delete())
+            conn.execute(replica_state.delete())
+            self._set_state(conn, **owner)
+
+    def _state(self):
+        with self.engine.connect() as conn:
+            return dict(conn.execute(select(replica_state.c.key, replica_state.c.value)).all())
+
+    @staticmethod
+    def _set_state(conn, **values):
+        statement = insert(replica_state)
+        conn.execute(
+            statement.on_conflict_do_update(index_elements=["key"], set_={"value": statement.excluded.value}),
+            [{"key": key, "value": value} for key, value in values.items()],
+        )
+
+    def synced_at(self):
+        """Время последней полной синхронизации или None, если копия еще не собрана"""
+        value = self._state().get("synced_at")
+        return datetime.fromisoformat(value) if value else None
+
+    def is_ready(self):
+        return self.synced_at() is not None
+
+    def fetch_page(self, status=None, date=None, after=None, limit=200):
+        """Страница заявок из копии — с той же сортировкой и keyset-пагинацией, что fetch_ticket_page"""
+        query = select(tickets)
+        if status is not None:
+            query = query.where(tickets.c.status == status)
+        if date is not None:
+            start, end = day_range(date)
+            if server_timestamps_aware():
+                # Границы местного дня — в UTC, как и хранимые значения
+                start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+            query = query.where(tickets.c.created_at >= start, tickets.c.created_at < end)
+        if after is not None:
+            query = query.where(or_(
+                tickets.c.created_at < after.created_at,
+                and_(tickets.c.created_at == after.created_at, tickets.c.id < after.id)
+            ))
+        query = query.order_by(tickets.c.created_at.desc(), tickets.c.id.desc()).limit(limit)
+        with self.engine.connect() as conn:
+            return conn.execute(query).all()
+
+    def store(self, rows):
+        """Записывает строки заявок (например, изменения из TicketSync), не сдвигая водяной знак"""
+        if rows:
+            with self.engine.begin() as conn:
+                self._upsert(conn, rows)
+
+    @staticmethod
+    def _upsert(conn, rows):
+        statement = insert(tickets)
+        conn.execute(
+            statement.on_conflict_do_update(
+                index_elements=["id"],
+                set_={field: statement.excluded[field] for field in ROW_FIELDS if field != "id"},
+            ),
+            [{field: getattr(row, field) for field in ROW_FIELDS} for row in rows],
+        )
+
+    def sync(self, max_rows=1000):
+        """Догружает изменения с сервера; возвращает измененные строки или None, если их
+        больше max_rows (дешевле перечитать список из копии, чем патчить построчно)."""
+        with self._sync_lock:
+            state = self._state()
+            since = datetime.fromisoformat(state["since"]) - OVERLAP if "since" in state else EPOCH
+            after_id = None
+            changed = []
+            with session_scope() as db:
+                while True:
+                    rows = fetch_ticket_changes(db, self.user, since, SYNC_BATCH, after_id)
+                    if rows:
+                        since, after_id = rows[-1].updated_at, rows[-1].id
+                        with self.engine.begin() as conn:
+                            self._upsert(conn, rows)
+                            self._set_state(conn, since=since.isoformat(timespec="microseconds"))
+                        if changed is not None:
+                            changed.extend(rows)
+                            if len(changed) > max_rows:
+                                changed = None
+                    if len(rows) < SYNC_BATCH:
+                        break
+            with self.engine.begin() as conn:
+                self._set_state(conn, synced_at=datetime.now(timezone.utc).isoformat())
+            return changed
@@ -0,0 +1,204 @@
+"""Инкрементальное обслуживание суточной сводки ticket_daily_stats.
+
+Вклад заявки в сводку: +1 opened в день создания и +1 closed в день закрытия, в ячейке с ее
+текущими статусом, приоритетом и техником. При изменении заявки ее старый вклад вычитается
+до записи, а новый добавляется после — тем же SQL, что и полный пересчет, поэтому сводка
+всегда совпадает с GROUP BY по tickets.
+
+    python ticket_rollup.py backfill                  # Полный пересчет
+    python ticket_rollup.py check --start 2024-01-01  # Сверка сводки с tickets
+"""
+import argparse
+from datetime import date
+
+from sqlalchemy import Date, delete, event, func, inspect, literal, select, true, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import Ticket, TicketDailyStat, TicketStatus
+
+# Поля заявки, от которых зависит ее ячейка в сводке
+TRACKED_FIELDS = ("status", "priority", "technician_id", "created_at", "closed_at")
+KEY_COLUMNS = ("day", "status", "priority", "technician_id")
+
+
+def contributions(ticket_filter=None, sign=1):
+    """SELECT вклада заявок в сводку: day, status, priority, technician_id, opened, closed"""
+    priority = func.coalesce(Ticket.priority, "")
+    technician_id = func.coalesce(Ticket.technician_id, 0)
+
+    opened = select(
+        func.date(Ticket.created_at).label("day"),
+        Ticket.status.label("status"),
+        priority.label("priority"),
+        technician_id.label("technician_id"),
+        literal(sign).label("opened"),
+        literal(0).label("closed"),
+    )
+    closed = select(
+        func.date(Ticket.closed_at),
+        Ticket.status,
+        priority,
+        technician_id,
+        literal(0),
+        literal(sign),
+    ).where(Ticket.closed_at.isnot(None))
+
+    if ticket_filter is not None:
+        opened = opened.where(ticket_filter)
+        closed = closed.where(ticket_filter)
+
+    parts = union_all(opened, closed).subquery()
+    return (
+        select(
+            *(parts.c[name] for name in KEY_COLUMNS),
+            func.sum(parts.c.opened).label("opened"),
+            func.sum(parts.c.closed).label("closed"),
+        )
+        .where(true())  # SQLite требует WHERE в INSERT ... SELECT ... ON CONFLICT
+        .group_by(*(parts.c[name] for name in KEY_COLUMNS))
+    )
+
+
+def _dialect_insert(dialect_name):
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    if dialect_name == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Сводка не поддерживает СУБД {dialect_name}")
+
+
+def _upsert(connection, insert):
+    statement = insert.on_conflict_do_update(
+        index_elements=list(KEY_COLUMNS),
+        set_={
+            "opened": TicketDailyStat.opened + insert.excluded.opened,
+            "closed": TicketDailyStat.closed + insert.excluded.closed,
+        },
+    )
+    connection.execute(statement)
+
+
+def apply_contributions(connection, ticket_filter, sign):
+    """Прибавляет (sign=1) или вычитает (sign=-1) вклад выбранных заявок одним upsert"""
+    insert = _dialect_insert(connection.dialect.name)(TicketDailyStat).from_select(
+        [*KEY_COLUMNS, "opened", "closed"], contributions(ticket_filter, sign)
+    )
+    _upsert(connection, insert)
+
+
+def apply_cells(connection, deltas):
+    """Прибавляет готовые приращения {(day, status, priority, technician_id): (opened, closed)}.
+
+    Для случаев, когда старое состояние заявок известно из RETURNING и перечитывать их не нужно.
+    Ключи уже в виде сводки: priority "" и technician_id 0 вместо NULL.
+    """
+    rows = [
+        dict(zip(KEY_COLUMNS, key), opened=opened, closed=closed)
+        for key, (opened, closed) in deltas.items()
+        if opened or closed
+    ]
+    if rows:
+        _upsert(connection, _dialect_insert(connection.dialect.name)(TicketDailyStat).values(rows))
+
+
+def _tracked_change(ticket):
+    attrs = inspect(ticket).attrs
+    return any(attrs[field].history.has_changes() for field in TRACKED_FIELDS)
+
+
+def _subtract_old_contributions(session, flush_context, instances):
+    changed = [
+        obj.id for obj in session.dirty
+        if isinstance(obj, Ticket) and obj.id is not None and _tracked_change(obj)
+    ]
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Ticket) and obj.id is not None]
+    session.info["rollup_changed_ids"] = changed
+    if changed or deleted:
+        apply_contributions(session.connection(), Ticket.id.in_(changed + deleted), -1)
+
+
+def _add_new_contributions(session, flush_context):
+    # В after_flush session.new еще содержит только что вставленные заявки
+    ids = session.info.pop("rollup_changed_ids", [])
+    ids += [obj.id for obj in session.new if isinstance(obj, Ticket)]
+    if ids:
+        apply_contributions(session.connection(), Ticket.id.in_(ids), 1)
+
+
+def install(session_factory):
+    """Подключает поддержку сводки к сессиям session_factory (sessionmaker или класс сессии).
+
+    Повторный вызов ничего не меняет. Сессии без этих обработчиков изменяют заявки,
+    не трогая сводку, — тогда ее придется пересчитать через backfill.
+    """
+    for name, handler in (("before_flush", _subtract_old_contributions), ("after_flush", _add_new_contributions)):
+        if not event.contains(session_factory, name, handler):
+            event.listen(session_factory, name, handler)
+
+
+def backfill(connection):
+    """Полный пересчет сводки по текущему состоянию tickets"""
+    connection.execute(delete(TicketDailyStat))
+    apply_contributions(connection, None, 1)
+
+
+def _key(day, status, priority, technician_id):
+    # Приводим значения к общему виду: SQLite отдает date() строкой, а статус — по-разному
+    status = status.name if isinstance(status, TicketStatus) else str(status)
+    return str(day)[:10], status, priority or "", technician_id or 0
+
+
+def check(connection, start_date=None, end_date=None):
+    """Сверяет сводку с GROUP BY по tickets; возвращает [(ключ, ожидалось, в сводке)]"""
+    expected_source = contributions().subquery()
+    expected_query = select(expected_source)
+    actual_query = select(TicketDailyStat)
+    if start_date is not None:
+        expected_query = expected_query.where(expected_source.c.day >= literal(start_date, Date()))
+        actual_query = actual_query.where(TicketDailyStat.day >= start_date)
+    if end_date is not None:
+        expected_query = expected_query.where(expected_source.c.day <= literal(end_date, Date()))
+        actual_query = actual_query.where(TicketDailyStat.day <= end_date)
+
+    expected = {
+        _key(row.day, row.status, row.priority, row.technician_id): (row.opened, row.closed)
+        for row in connection.execute(expected_query)
+    }
+    actual = {
+        _key(row.day, row.status, row.priority, row.technician_id): (row.opened, row.closed)
+        for row in connection.execute(actual_query)
+        if row.opened or row.closed
+    }
+
+    return [
+        (key, expected.get(key, (0, 0)), actual.get(key, (0, 0)))
+        for key in sorted(expected.keys() | actual.keys())
+        if expected.get(key, (0, 0)) != actual.get(key, (0, 0))
+    ]
+
+
+def main():
+    from database import engine, maintenance_transaction
+
+    parser = argparse.ArgumentParser(description="Обслуживание суточной сводки заявок")
+    parser.add_argument("command", choices=["backfill", "check"])
+    parser.add_argument("--start", type=date.fromisoformat, help="Первый день сверки (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Последний день сверки (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    TicketDailyStat.__table__.create(bind=engine, checkfirst=True)
+    with maintenance_transaction(engine) as connection:
+        if args.command == "backfill":
+            backfill(connection)
+            print("Сводка пересчитана")
+            return
+
+        mismatches = check(connection, args.start, args.end)
+    for key, expected, actual in mismatches:
+        print(f"{key}: ожидалось opened/closed={expected}, в сводке {actual}")
+    print(f"Расхождений: {len(mismatches)}")
+    raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Полнотекстовый поиск по заголовкам и описаниям заявок.
+
+PostgreSQL: генерируемая колонка tickets.search_vector (русская и английская конфигурации)
+с GIN-индексом. SQLite (локальная отладка): внешняя FTS5-таблица tickets_fts с триггерами.
+Колонка не объявлена в модели, чтобы схема оставалась переносимой между СУБД.
+"""
+import html
+
+from sqlalchemy import Float, Integer, String, func, literal_column, text
+
+from database import maintenance_transaction
+from models import Ticket
+from ticket_queries import ticket_rows_query, visible_to
+
+SEARCH_LIMIT = 200
+
+# Маркеры подсветки: экранируем текст и только потом превращаем их в теги
+HIGHLIGHT_START = "⟦"
+HIGHLIGHT_STOP = "⟧"
+
+POSTGRES_DDL = (
+    """
+    ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tickets_search ON tickets USING GIN (search_vector)",
+)
+
+SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+        title, description, content='tickets', content_rowid='id', tokenize='unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_fts_update AFTER UPDATE OF title, description ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tickets_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')",
+)
+
+
+def install_search(bind):
+    """Создает колонку/индекс (PostgreSQL) или FTS5-таблицу с триггерами (SQLite)"""
+    statements = {"postgresql": POSTGRES_DDL, "sqlite": SQLITE_DDL}.get(bind.dialect.name)
+    if statements is None:
+        return False
+    # Генерируемая колонка переписывает всю таблицу, а GIN-индекс строится долго
+    with maintenance_transaction(bind) as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+    return True
+
+
+def highlight_html(value):
+    """Текст с маркерами подсветки -> безопасный HTML с <b>"""
+    if not value:
+        return value
+    escaped = html.escape(value)
+    return escaped.replace(HIGHLIGHT_START, "<b>").replace(HIGHLIGHT_STOP, "</b>")
+
+
+def _postgres_matches(db, user, search_text, status):
+    ts_query = func.websearch_to_tsquery(literal_column("'russian'::regconfig"), search_text).op("||")(
+        func.websearch_to_tsquery(literal_column("'english'::regconfig"), search_text)
+    )
+    search_vector = literal_column("tickets.search_vector")
+    rank = func.ts_rank(search_vector, ts_query)
+    matched = visible_to(
+        db.query(Ticket.id.label("id"), rank.label("rank")).filter(search_vector.op("@@")(ts_query)),
+        user
+    )
+    if status is not None:
+        matched = matched.filter(Ticket.status == status)
+    matched = matched.order_by(rank.desc()).limit(SEARCH_LIMIT).subquery("matched")
+
+    # ts_headline дорогой — считаем его только для уже отобранных строк
+    def headline(column, options):
+        return func.ts_headline(
+            literal_column("'russian'::regconfig"), column, ts_query,
+            f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, {options}"
+        )
+
+    return matched, (
+        headline(Ticket.title, "HighlightAll=true").label("title_headline"),
+        headline(Ticket.description, "MaxWords=20, MinWords=5").label("description_snippet"),
+    )
+
+
+def fts5_query(search_text):
+    """Пользовательский ввод -> безопасный запрос FTS5: все слова по префиксу"""
+    words = search_text.split()
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+
+
+def _sqlite_matches(search_text):
+    matched = text(
+        "SELECT rowid AS id, bm25(tickets_fts, 10.0, 1.0) AS rank, "
+        "highlight(tickets_fts, 0, :start, :stop) AS title_headline, "
+        "snippet(tickets_fts, 1, :start, :stop, '…', 12) AS description_snippet "
+        "FROM tickets_fts WHERE tickets_fts MATCH :match"
+    ).bindparams(
+        start=HIGHLIGHT_START, stop=HIGHLIGHT_STOP, match=fts5_query(search_text)
+    ).columns(
+        id=Integer, rank=Float, title_headline=String, description_snippet=String
+    ).subquery("matched")
+    return matched, (
+        matched.c.title_headline,
+        matched.c.description_snippet,
+    )
+
+
+def search_tickets(db, user, search_text, status=None):
+    """Ранжированный поиск: строки списка заявок + title_headline и description_snippet с маркерами"""
+    search_text = search_text.strip()
+    if not search_text:
+        return []
+
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        matched, extra = _postgres_matches(db, user, search_text, status)
+        order = matched.c.rank.desc()
+    elif dialect_name == "sqlite":
+        matched, extra = _sqlite_matches(search_text)
+        order = matched.c.rank  # bm25: меньше — релевантнее
+    else:
+        raise NotImplementedError(f"Поиск не поддерживает СУБД {dialect_name}")
+
+    query = ticket_rows_query(db).add_columns(*extra).join(matched, matched.c.id == Ticket.id)
+    query = visible_to(query, user)
+    if status is not None:
+        query = query.filter(Ticket.status == status)
+    return query.order_by(order).limit(SEARCH_LIMIT).all()
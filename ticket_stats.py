@@ -0,0 +1,76 @@
+from sqlalchemy import func, or_
+
+from models import Ticket, TicketDailyStat, User, UserRole
+from ticket_queries import created_between, day_range, report_scope
+
+
+def close_hours(dialect_name):
+    """Время от создания до закрытия в часах — выражение для текущей СУБД"""
+    if dialect_name == "sqlite":
+        return (func.julianday(Ticket.closed_at) - func.julianday(Ticket.created_at)) * 24
+    return func.extract("epoch", Ticket.closed_at - Ticket.created_at) / 3600
+
+
+def rollup_scope(query, user, start_date, end_date):
+    """Фильтр суточной сводки по периоду и правам, как report_scope для tickets"""
+    query = query.filter(TicketDailyStat.day.between(start_date, end_date))
+    if user.role == UserRole.TECHNICIAN:
+        query = query.filter(TicketDailyStat.technician_id == user.id)
+    return query
+
+
+def report_summary(db, user, start_date, end_date):
+    """Сводка для отчета, посчитанная GROUP BY на стороне БД.
+
+    Счетчики читаются из суточной сводки ticket_daily_stats (сотни строк на год),
+    время закрытия и хвост открытых — несколькими агрегатами по tickets.
+    """
+    in_period = created_between(start_date, end_date)
+    opened = func.sum(TicketDailyStat.opened)
+
+    def grouped(column, query=None):
+        query = query if query is not None else db.query(column, opened)
+        query = rollup_scope(query, user, start_date, end_date)
+        return query.group_by(column).having(opened > 0).order_by(opened.desc()).all()
+
+    by_status = grouped(TicketDailyStat.status)
+    by_priority = grouped(TicketDailyStat.priority)
+    by_technician = grouped(
+        User.full_name,
+        db.query(User.full_name, opened).select_from(TicketDailyStat)
+        .outerjoin(User, TicketDailyStat.technician_id == User.id)
+    )
+    totals = rollup_scope(
+        db.query(func.coalesce(opened, 0), func.coalesce(func.sum(TicketDailyStat.closed), 0)),
+        user, start_date, end_date
+    ).one()
+
+    dialect_name = db.get_bind().dialect.name
+    hours = close_hours(dialect_name)
+    close_columns = [func.avg(hours)]
+    if dialect_name == "postgresql":
+        close_columns.append(func.percentile_cont(0.5).within_group(hours))
+    close_stats = report_scope(
+        db.query(*close_columns).filter(in_period, Ticket.closed_at.isnot(None)), user
+    ).one()
+
+    # Открытые на конец периода: созданы до его конца и не закрыты к этому моменту
+    _, period_end = day_range(start_date, end_date)
+    open_backlog = report_scope(
+        db.query(func.count(Ticket.id)).filter(
+            Ticket.created_at < period_end,
+            or_(Ticket.closed_at.is_(None), Ticket.closed_at >= period_end)
+        ),
+        user
+    ).scalar()
+
+    return {
+        "by_status": [(status.value if status else "—", count) for status, count in by_status],
+        "by_priority": [(priority or "—", count) for priority, count in by_priority],
+        "by_technician": [(name or "Не назначен", count) for name, count in by_technician],
+        "opened": totals[0],
+        "closed": totals[1],
+        "avg_close_hours": close_stats[0],
+        "median_close_hours": close_stats[1] if len(close_stats) > 1 else None,
+        "open_backlog": open_backlog,
+    }
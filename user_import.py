@@ -0,0 +1,163 @@
+"""Массовый импорт пользователей из CSV.
+
+Колонки: username, password, full_name и необязательная role (client/technician/admin,
+по умолчанию client). Пароли хешируются в пуле процессов, занятые логины проверяются одним
+запросом, пользователи вставляются пачками. Ошибочные строки попадают в отчет и не прерывают
+загрузку остальных.
+
+    python user_import.py users.csv --workers 8
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from auth import hash_password
+from database import session_scope
+from models import User, UserRole
+
+REQUIRED_COLUMNS = ("username", "password", "full_name")
+BATCH_SIZE = 500
+USERNAME_LENGTH = 50  # Размер колонки users.username
+FULL_NAME_LENGTH = 100
+
+
+class ImportReport:
+    """Итог импорта: сколько создано и ошибки по строкам [(номер строки, логин, сообщение)]"""
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, username, message):
+        self.errors.append((line, username, message))
+
+    def summary(self):
+        return f"Создано пользователей: {self.created}, ошибок: {len(self.errors)}"
+
+    def error_lines(self):
+        return [f"строка {line} ({username or '—'}): {message}" for line, username, message in sorted(self.errors)]
+
+
+def read_rows(file_path):
+    """[(номер строки, словарь колонок)]; utf-8-sig снимает BOM из файлов Excel"""
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"В CSV нет колонок: {', '.join(missing)}")
+        return [(reader.line_num, row) for row in reader]
+
+
+def validate_rows(rows, report):
+    """Проверки без обращения к БД; возвращает [(строка, username, password, full_name, role)]"""
+    valid = []
+    seen = set()
+    for line, row in rows:
+        username = (row.get("username") or "").strip()
+        password = row.get("password") or ""
+        full_name = (row.get("full_name") or "").strip()
+        role_value = (row.get("role") or UserRole.CLIENT.value).strip().lower()
+
+        if not username or not password or not full_name:
+            report.add_error(line, username, "Логин, пароль и полное имя обязательны")
+        elif len(username) > USERNAME_LENGTH or len(full_name) > FULL_NAME_LENGTH:
+            report.add_error(line, username, "Слишком длинный логин или имя")
+        elif role_value not in {role.value for role in UserRole}:
+            report.add_error(line, username, f"Неизвестная роль: {role_value}")
+        elif username in seen:
+            report.add_error(line, username, "Логин повторяется в файле")
+        else:
+            seen.add(username)
+            valid.append((line, username, password, full_name, UserRole(role_value)))
+    return valid
+
+
+def drop_existing(rows, report):
+    """Убирает строки с уже занятыми логинами — одним запросом на весь файл"""
+    if not rows:
+        return rows
+    with session_scope() as db:
+        taken = set(db.execute(
+            select(User.username).where(User.username.in_([row[1] for row in rows]))
+        ).scalars())
+    for line, username, *_ in rows:
+        if username in taken:
+            report.add_error(line, username, "Пользователь с таким логином уже существует")
+    return [row for row in rows if row[1] not in taken]
+
+
+def hash_passwords(passwords, workers=None):
+    """bcrypt в пуле процессов: каждое хеширование занимает ядро на сотни миллисекунд"""
+    if len(passwords) < 2 or workers == 1:
+        return [hash_password(password) for password in passwords]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(passwords) // (workers * 4))
+    # spawn, а не fork: импорт идет из фонового потока окна, fork из потока может зависнуть
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(hash_password, passwords, chunksize=chunksize))
+
+
+def insert_batch(batch, report):
+    values = [
+        {"username": username, "password_hash": password_hash, "full_name": full_name, "role": role}
+        for _, username, password_hash, full_name, role in batch
+    ]
+    try:
+        with session_scope() as db:
+            db.execute(insert(User), values)
+        report.created += len(batch)
+        return
+    except IntegrityError:
+        pass
+
+    # Логин заняли параллельно — досохраняем пачку построчно, чтобы найти виновную строку
+    for (line, username, *_), row_values in zip(batch, values):
+        try:
+            with session_scope() as db:
+                db.execute(insert(User), [row_values])
+            report.created += 1
+        except IntegrityError:
+            report.add_error(line, username, "Пользователь с таким логином уже существует")
+
+
+def import_users(file_path, workers=None, batch_size=BATCH_SIZE):
+    """Импортирует пользователей из CSV; возвращает ImportReport"""
+    report = ImportReport()
+    rows = drop_existing(validate_rows(read_rows(file_path), report), report)
+
+    hashes = hash_passwords([password for _, _, password, _, _ in rows], workers)
+    rows = [
+        (line, username, password_hash, full_name, role)
+        for (line, username, _, full_name, role), password_hash in zip(rows, hashes)
+    ]
+    for start in range(0, len(rows), batch_size):
+        insert_batch(rows[start:start + batch_size], report)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт пользователей из CSV")
+    parser.add_argument("file", help="CSV с колонками username, password, full_name[, role]")
+    parser.add_argument("--workers", type=int, help="Процессов для хеширования (по умолчанию — все ядра)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        report = import_users(args.file, args.workers, args.batch_size)
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Ошибка: {e}")
+    for line in report.error_lines():
+        print(line)
+    print(f"{report.summary()} за {time.perf_counter() - started:.1f} с")
+    raise SystemExit(1 if report.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
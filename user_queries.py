@@ -0,0 +1,66 @@
+from sqlalchemy import and_, func, or_
+
+from models import User
+
+# Колонки таблицы пользователей в порядке отображения; по ним же сортирует заголовок
+USER_ROW_COLUMNS = (
+    User.id,
+    User.username,
+    User.full_name,
+    User.role,
+)
+
+FULL_NAME_COLUMN = 2
+
+# Выражения сортировки: NULL в полном имени превращаем в "", иначе keyset теряет такие строки
+SORT_KEYS = (
+    User.id,
+    User.username,
+    func.coalesce(User.full_name, ""),
+    User.role,
+)
+
+
+def like_pattern(text):
+    """Подстрока для LIKE с экранированными спецсимволами"""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def fetch_user_page(db, search=None, role=None, sort_column=0, descending=False, after=None, limit=200):
+    """Страница пользователей с фильтром и сортировкой на стороне БД.
+
+    search — подстрока логина или полного имени, role — UserRole или None.
+    after — последняя строка предыдущей страницы (keyset по ключу сортировки и id).
+    """
+    query = db.query(*USER_ROW_COLUMNS)
+
+    if search:
+        pattern = like_pattern(search)
+        query = query.filter(or_(
+            User.username.ilike(pattern, escape="\\"),
+            User.full_name.ilike(pattern, escape="\\")
+        ))
+
+    if role is not None:
+        query = query.filter(User.role == role)
+
+    sort_key = SORT_KEYS[sort_column]
+    if after is not None:
+        value = after[sort_column]
+        if value is None and sort_column == FULL_NAME_COLUMN:
+            value = ""
+        if sort_key is User.id:
+            query = query.filter(User.id < after.id if descending else User.id > after.id)
+        elif descending:
+            query = query.filter(or_(sort_key < value, and_(sort_key == value, User.id < after.id)))
+        else:
+            query = query.filter(or_(sort_key > value, and_(sort_key == value, User.id > after.id)))
+
+    if sort_key is User.id:
+        order = (User.id.desc(),) if descending else (User.id,)
+    elif descending:
+        order = (sort_key.desc(), User.id.desc())
+    else:
+        order = (sort_key, User.id)
+    return query.order_by(*order).limit(limit).all()